@@ -1,21 +1,79 @@
 import asyncio
+import json
+import logging
 import os
 import signal
 import time
+from dataclasses import replace
 from datetime import datetime
 
+# imported up front: loading ccxt takes a while, better at startup than on the first exchange call
+from ccxt.async_support import binance as BinanceAsync
+
+from binance_rest import BinanceREST
 from config import get_config
 from logger import get_logger
-from utils import (
-    check_price_drop,
-    check_profit_target,
-    check_stop_loss,
-    exponential_backoff,
-)
+from price_window import PriceWindow
+from strategy_kernel import BUY, EMERGENCY_SELL, HOLD, SELL, make_entry_check, make_sliding_tick
+from utils import async_retry, decorrelated_jitter
+
+try:
+    # optional: faster drop-in event loop (not available on Windows)
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    # optional: typed decoding of stream messages, much faster than json.loads
+    import msgspec
+except ImportError:
+    msgspec = None
 
 
 logger = get_logger()
 
+# Binance trade streams — prices are pushed here, REST is kept for balances/orders
+STREAM_URL = "wss://stream.binance.com:9443/ws"
+TESTNET_STREAM_URL = "wss://stream.testnet.binance.vision/ws"
+
+# tumbling windows are aligned to midnight CEST (UTC+2)
+CEST_OFFSET_SECONDS = 2 * 3600
+
+# in-position tick outcome by (tp_hit | sl_hit << 1); take-profit wins if both
+_EXIT_ACTIONS = (HOLD, SELL, EMERGENCY_SELL, SELL)
+
+# circuit breaker: this many REST failures in a row pauses trading for the cooldown
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN_SECONDS = 60
+
+
+if msgspec is not None:
+    class TradeMsg(msgspec.Struct):
+        """Binance @trade payload — only the fields we read, the rest are skipped."""
+        p: str   # price
+        T: int   # trade time (ms)
+        s: str   # symbol
+
+    _TRADE_DECODER = msgspec.json.Decoder(TradeMsg)
+else:
+    _TRADE_DECODER = None
+
+
+def decode_trade(raw):
+    """Return (price, ts_seconds) from a raw @trade stream message."""
+    if _TRADE_DECODER is not None:
+        msg = _TRADE_DECODER.decode(raw)
+        return float(msg.p), msg.T / 1000
+    payload = json.loads(raw)
+    return float(payload["p"]), payload["T"] / 1000
+
+
+def run_async(coro):
+    """Run a coroutine to completion on a fresh event loop (uvloop if installed)."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
 
 class TradingBot:
     """A simple momentum trading bot demo.
@@ -25,52 +83,155 @@ class TradingBot:
 
     def __init__(self, symbol=None, balance: float = None, config=None):
         self.config = config or get_config()
-        self.symbol = symbol or self.config.get("SYMBOL", "BTC/USDT")
-        self.testnet = self.config.get("TESTNET", True)
+        self.symbol = symbol or self.config.symbol
+        self._base_asset, _, self._quote_asset = self.symbol.partition("/")
+        self._market_id = self.symbol.replace("/", "")  # exchange-native id, e.g. BTCUSDT
+        self.testnet = self.config.testnet
 
         # position / money tracking — balance will be fetched from exchange if None
         self._initial_balance = balance
         self.available_balance = float(balance) if balance else 0.0
+        self._balance_fetched_at = None  # monotonic time of last successful fetch_balance
         self.in_position = False
-        self.entry_price = None
+        self._entry_price = None
         self.position_qty = 0.0
 
-        # price window for momentum check (timestamp, price)
-        self.price_window = []
-        lookback = self.config.get("LOOKBACK_MINUTES", 5)
-        self.window_seconds = int(lookback) * 60
+        # price window for momentum check (timestamp, price), oldest first
+        self._window = PriceWindow()
+        self.window_seconds = int(self.config.lookback_minutes) * 60
+        # "sliding": reference is the oldest tick in the last window_seconds
+        # "tumbling": reference is the open of the current fixed window
+        self.window_mode = self.config.window_mode
+        self._current_window_id = None
+        self._window_open_price = None
 
         # trading rules — all from config, can be updated at runtime
-        self.trade_fraction = float(self.config.get("TRADE_FRACTION", 0.1))
-        self.buy_drop_pct = float(self.config.get("BUY_DROP_PCT", 2.0))
-        self.profit_target_pct = float(self.config.get("TAKE_PROFIT_PCT", 3.0))
-        self.stop_loss_pct = float(self.config.get("STOP_LOSS_PCT", 5.0))
+        self.trade_fraction = self.config.trade_fraction
+        self.buy_drop_pct = self.config.buy_drop_pct  # also builds the specialized entry check
+        self._profit_target_pct = self.config.take_profit_pct
+        self._stop_loss_pct = self.config.stop_loss_pct
+        self._update_exit_prices()
 
         # control
         self._running = False
         self._backoff_attempts = 0
-
-        # exchange client (lazy init)
+        self._retry_delay = 0.0
+        self._ws = None
+        self._user_ws = None  # user-data stream; while connected it keeps available_balance current
+        self._stop_event = None  # set by stop(); wakes the status/reconnect sleeps (created in run())
+        # circuit breaker: after repeated REST failures, stop trading for a cooldown
+        self._failures = 0
+        self._circuit_open_until = 0.0
+        self._last_price = None
+
+        # optional fill hooks, called after a buy/sell goes through:
+        # on_buy(price, qty) and on_sell(price, qty, entry_price, emergency)
+        self.on_buy = None
+        self.on_sell = None
+
+        # bound once so the per-tick level check skips the attribute lookups
+        self._log_enabled = logger.isEnabledFor
+
+        # exchange client + the HTTP session it shares with the price stream (lazy init)
         self._exchange = None
+        self._rest = None  # direct REST client for ticker/orders (see binance_rest.py)
+        self._session = None
 
         logger.info("TradingBot init: symbol=%s testnet=%s", self.symbol, self.testnet)
 
+    @property
+    def price_window(self):
+        return self._window
+
+    @price_window.setter
+    def price_window(self, ticks):
+        """Accept a PriceWindow or any iterable of (timestamp, price) tuples."""
+        self._window = ticks if isinstance(ticks, PriceWindow) else PriceWindow.from_ticks(ticks)
+
+    # entry price and the strategy % settings are properties so whatever the tick
+    # path derives from them is rebuilt only when one of them changes
+    @property
+    def entry_price(self):
+        return self._entry_price
+
+    @entry_price.setter
+    def entry_price(self, value):
+        self._entry_price = value
+        self._update_exit_prices()
+
+    @property
+    def profit_target_pct(self):
+        return self._profit_target_pct
+
+    @profit_target_pct.setter
+    def profit_target_pct(self, value):
+        self._profit_target_pct = value
+        self._update_exit_prices()
+
+    @property
+    def stop_loss_pct(self):
+        return self._stop_loss_pct
+
+    @stop_loss_pct.setter
+    def stop_loss_pct(self, value):
+        self._stop_loss_pct = value
+        self._update_exit_prices()
+
+    @property
+    def buy_drop_pct(self):
+        return self._buy_drop_pct
+
+    @buy_drop_pct.setter
+    def buy_drop_pct(self, value):
+        self._buy_drop_pct = value
+        # threshold is baked into the compiled checks, so swap in ones built for the new value
+        self._entry_check = make_entry_check(value)
+        self._sliding_tick = make_sliding_tick(value)
+
+    @property
+    def take_profit_price(self):
+        """Absolute take-profit level for the open position (inf when there's no entry)."""
+        return self._tp_price
+
+    @property
+    def stop_loss_price(self):
+        """Absolute stop-loss level for the open position (-inf when there's no entry)."""
+        return self._sl_price
+
+    def _update_exit_prices(self):
+        entry = self._entry_price
+        if not entry:
+            # no entry yet: nothing can trigger an exit
+            self._tp_price, self._sl_price = float("inf"), float("-inf")
+            return
+        self._tp_price = entry * (1 + self._profit_target_pct / 100)
+        self._sl_price = entry * (1 - self._stop_loss_pct / 100)
+
     # ============ Exchange connection ============
-    def _init_exchange(self):
-        """Initialize CCXT exchange client for Binance (testnet or mainnet)."""
-        import ccxt
+    def _http_session(self):
+        """One pooled aiohttp session for ccxt and the websocket, so TLS/DNS work is reused."""
+        if self._session is None:
+            import aiohttp
 
-        api_key = self.config.get("API_KEY", "")
-        api_secret = self.config.get("API_SECRET", "")
+            connector = aiohttp.TCPConnector(
+                limit=2000, limit_per_host=100, ttl_dns_cache=300, keepalive_timeout=75
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _init_exchange(self):
+        """Initialize CCXT async exchange client for Binance (testnet or mainnet)."""
+        api_key = self.config.api_key
+        api_secret = self.config.api_secret
 
         if not api_key or not api_secret:
             raise ValueError("API_KEY and API_SECRET must be set in .env")
 
-        exchange_class = ccxt.binance
         params = {
             "apiKey": api_key,
             "secret": api_secret,
             "enableRateLimit": True,
+            "session": self._http_session(),  # ccxt won't close a session it didn't create
         }
 
         if self.testnet:
@@ -84,67 +245,98 @@ class TradingBot:
             # also need to set sandbox mode
             params["options"] = {"defaultType": "spot"}
 
-        self._exchange = exchange_class(params)
+        self._exchange = BinanceAsync(params)
 
         if self.testnet:
             self._exchange.set_sandbox_mode(True)
 
+        # ticker and orders skip ccxt's request building; cold paths keep using ccxt
+        self._rest = BinanceREST(self._http_session(), api_key, api_secret, testnet=self.testnet)
+
         logger.info("Exchange client initialized (testnet=%s)", self.testnet)
 
-    def fetch_balance(self):
+    async def fetch_balance(self):
         if not self._exchange:
             self._init_exchange()
 
         try:
-            balance = self._exchange.fetch_balance()
-            usdt_free = balance.get("USDT", {}).get("free", 0.0)
-            self.available_balance = float(usdt_free)
+            balance = await self._exchange.fetch_balance()
+            # ccxt already parses amounts to floats (None for unknown)
+            self.available_balance = balance.get("USDT", {}).get("free") or 0.0
+            self._balance_fetched_at = time.monotonic()
             logger.info("Fetched balance: %.2f USDT", self.available_balance)
             return self.available_balance
         except Exception as e:
             logger.error("Failed to fetch balance: %s", str(e))
             raise
 
-    def fetch_all_balances(self):
+    async def refresh_balance_if_stale(self, max_age: float = 30.0):
+        """Re-fetch the USDT balance if the cached one is older than max_age seconds.
+
+        Errors are logged and the cached balance returned — a stale balance
+        shouldn't take down the price loop.
+        """
+        if self._user_ws is not None:
+            # the user-data stream pushes every balance change
+            return self.available_balance
+        fetched_at = self._balance_fetched_at
+        if fetched_at is not None and time.monotonic() - fetched_at < max_age:
+            return self.available_balance
+        try:
+            return await self.fetch_balance()
+        except Exception:
+            return self.available_balance
+
+    async def fetch_all_balances(self):
         if not self._exchange:
             self._init_exchange()
 
         try:
-            balance = self._exchange.fetch_balance()
-            holdings = {}
-            for asset, data in balance.get('total', {}).items():
-                if float(data) > 0.00001:
-                    holdings[asset] = float(data)
-            return holdings
+            balance = await self._exchange.fetch_balance()
+            # totals are floats already; None means the exchange didn't report one
+            return {asset: total for asset, total in balance.get('total', {}).items()
+                    if total is not None and total > 0.00001}
         except Exception as e:
             logger.error("Failed to fetch all balances: %s", str(e))
             return {}
 
-    def fetch_open_position(self):
-        """Check if we have an existing position (holding the base asset)."""
+    async def fetch_open_position(self):
+        """Check if we have an existing position (holding the base asset).
+
+        Balance, recent trades and (if the stream hasn't given us one yet) the
+        ticker are fetched concurrently.
+        """
         if not self._exchange:
             self._init_exchange()
 
         try:
-            base_asset = self.symbol.split("/")[0]
-            balance = self._exchange.fetch_balance()
+            base_asset = self._base_asset
+            calls = [
+                self._exchange.fetch_balance(),
+                self._exchange.fetch_my_trades(self.symbol, limit=10),
+            ]
+            if self._last_price is None:
+                calls.append(self.fetch_price())
+            balance, trades, *price = await asyncio.gather(*calls, return_exceptions=True)
+            if isinstance(balance, Exception):
+                raise balance
             held_qty = float(balance.get(base_asset, {}).get("free", 0.0))
             
             if held_qty > 0.00001:
-                current_price = self.fetch_price()
+                current_price = price[0] if price else self._last_price
+                if isinstance(current_price, Exception):
+                    raise current_price
                 self.in_position = True
                 self.position_qty = held_qty
                 
                 entry_price = current_price
-                try:
-                    trades = self._exchange.fetch_my_trades(self.symbol, limit=10)
-                    buy_trades = [t for t in trades if t.get('side') == 'buy']
-                    if buy_trades:
-                        last_buy = buy_trades[-1]
+                # trade history is best effort — fall back to the current price
+                if not isinstance(trades, Exception):
+                    # trades are oldest first — scan from the end for the latest buy
+                    last_buy = next((t for t in reversed(trades) if t.get('side') == 'buy'), None)
+                    if last_buy:
                         entry_price = float(last_buy.get('price', current_price))
                         logger.info("Found entry price from last buy: $%.2f", entry_price)
-                except:
-                    pass
                 
                 self.entry_price = entry_price
                 
@@ -163,81 +355,117 @@ class TradingBot:
             logger.error("Failed to check position: %s", str(e))
             return None
 
-    def fetch_recent_trades(self, limit=10):
+    async def fetch_recent_trades(self, limit=10):
         """Fetch recent trades from exchange."""
         if not self._exchange:
             self._init_exchange()
 
         try:
-            trades = self._exchange.fetch_my_trades(self.symbol, limit=limit)
+            trades = await self._exchange.fetch_my_trades(self.symbol, limit=limit)
             return trades
         except Exception as e:
             logger.error("Failed to fetch trades: %s", str(e))
             return []
 
-    def fetch_price(self):
-        """Fetch current price for symbol."""
+    async def fetch_price(self):
+        """Fetch current price for symbol (retried with jittered backoff).
+
+        Counts as one circuit-breaker failure only once every retry has failed.
+        """
         if not self._exchange:
             self._init_exchange()
 
         try:
-            ticker = self._exchange.fetch_ticker(self.symbol)
-            price = float(ticker["last"])
-            return price
+            price = await self._fetch_price_retried()
         except Exception as e:
             logger.error("Failed to fetch price: %s", str(e))
+            self._record_failure()
             raise
+        self._failures = 0
+        return price
+
+    @async_retry()
+    async def _fetch_price_retried(self):
+        if self._rest is not None:
+            return await self._rest.ticker_price(self._market_id)
+        return (await self._exchange.fetch_ticker(self.symbol))["last"]
+
+    # ============ Circuit breaker ============
+    def _record_failure(self):
+        self._failures += 1
+        if self._failures >= CIRCUIT_FAILURE_THRESHOLD:
+            self._circuit_open_until = time.monotonic() + CIRCUIT_COOLDOWN_SECONDS
+            self._failures = 0
+            logger.error("Exchange keeps failing — pausing trading for %ds", CIRCUIT_COOLDOWN_SECONDS)
+
+    @property
+    def circuit_open(self):
+        return time.monotonic() < self._circuit_open_until
 
     # ============ Core logic (pure-ish) ============
-    def process_price_tick(self, price: float, ts: float = None):
+    async def process_price_tick(self, price: float, ts: float = None):
         """Process a new price tick. This is the core entrypoint for strategy logic.
 
         Designed to be callable from tests without network dependencies.
         """
         ts = ts or time.time()
-        # append and purge old entries
-        self.price_window.append((ts, float(price)))
-        cutoff = ts - self.window_seconds
-        self.price_window = [(t, p) for (t, p) in self.price_window if t >= cutoff]
-
-        # need at least a reference price from 5min ago - use earliest in window
-        if not self.price_window:
-            return
-
-        reference_time, reference_price = self.price_window[0]
         current_price = float(price)
 
-        # DEBUG level logs for prices
-        logger.debug("Tick %s price=%.2f ref=%.2f", datetime.utcfromtimestamp(ts).isoformat(), current_price, reference_price)
-
-        # If not in a trade, consider buy
-        if not self.in_position:
-            should_buy, drop_pct = check_price_drop(current_price, reference_price, threshold_pct=self.buy_drop_pct)
-            if should_buy:
-                logger.info("Buy signal detected: drop=%.2f%%", drop_pct)
-                self.execute_buy(price=current_price)
-            # else: no-op
+        if self.window_mode == "tumbling":
+            reference_price = self._tumbling_reference(ts, current_price)
+            if self.in_position:
+                # exits are plain compares against the precomputed TP/SL prices:
+                # bit 0 = take-profit hit, bit 1 = stop-loss hit
+                action = _EXIT_ACTIONS[(current_price >= self._tp_price) | ((current_price <= self._sl_price) << 1)]
+                pct = abs(current_price - self._entry_price) / self._entry_price * 100.0 if action else 0.0
+            else:
+                # buy when flat — one compiled call with the threshold baked in
+                action, pct = self._entry_check(current_price, reference_price)
+        else:
+            # append, then purge + reference + signal check in one compiled pass
+            window = self._window
+            window.append(ts, current_price)
+            action, pct = window.evaluate(
+                self._sliding_tick, ts - self.window_seconds, current_price, self.in_position,
+                self._entry_price or 0.0, self._tp_price, self._sl_price,
+            )
+            reference_price = None
+
+        # DEBUG level logs for prices (only build the timestamp string if it'll be printed)
+        if self._log_enabled(logging.DEBUG):
+            if reference_price is None:
+                reference_price = window.first()[1]
+            logger.debug("Tick %s price=%.2f ref=%.2f", datetime.utcfromtimestamp(ts).isoformat(), current_price, reference_price)
+
+        if action == HOLD:
+            return
+        if self.circuit_open:
+            # exchange is failing; drop the signal instead of piling on more orders
             return
 
-        # If we are in a trade, check for profit target or stop loss
-        sold = False
-        hit_profit, profit_pct = check_profit_target(current_price, self.entry_price, target_pct=self.profit_target_pct)
-        if hit_profit:
-            logger.info("Profit target hit: %.2f%% — selling", profit_pct)
-            self.execute_sell(price=current_price)
-            sold = True
-
-        if not sold:
-            hit_stop, loss_pct = check_stop_loss(current_price, self.entry_price, stop_pct=self.stop_loss_pct)
-            if hit_stop:
-                logger.error("Stop-loss triggered: %.2f%% loss — emergency sell", loss_pct)
-                self.execute_sell(price=current_price, emergency=True)
+        if action == BUY:
+            logger.info("Buy signal detected: drop=%.2f%%", pct)
+            await self.execute_buy(price=current_price)
+        elif action == SELL:
+            logger.info("Profit target hit: %.2f%% — selling", pct)
+            await self.execute_sell(price=current_price)
+        else:
+            logger.error("Stop-loss triggered: %.2f%% loss — emergency sell", pct)
+            await self.execute_sell(price=current_price, emergency=True)
+
+    def _tumbling_reference(self, ts: float, price: float):
+        """Open price of the fixed window containing ts — O(1), no tick history kept."""
+        window_id = int((ts + CEST_OFFSET_SECONDS) // self.window_seconds)
+        if window_id != self._current_window_id:
+            self._current_window_id = window_id
+            self._window_open_price = price
+        return self._window_open_price
 
     # ============ Simulated order execution (for tests) ============
-    def buy(self, price: float):
+    async def buy(self, price: float):
         """Simulate placing a buy order using a fraction of available balance.
 
-        Used by tests. For real trading, use execute_buy().
+        Used by tests (swap in for execute_buy()). For real trading, use execute_buy().
         """
         if self.in_position:
             logger.warning("Attempt to buy while already in position — ignored")
@@ -257,22 +485,26 @@ class TradingBot:
 
         logger.info("BUY executed: price=%.2f qty=%.6f used=%.2f", price, self.position_qty, amount_to_use)
         # TODO: record order id, timestamp etc. temporary solution
+        if self.on_buy is not None:
+            self.on_buy(price, self.position_qty)
 
-    def sell(self, price: float, emergency: bool = False):
+    async def sell(self, price: float, emergency: bool = False):
         """Simulate selling the current position.
 
-        Used by tests. For real trading, use execute_sell().
+        Used by tests (swap in for execute_sell()). For real trading, use execute_sell().
         """
         if not self.in_position:
             logger.warning("Attempt to sell but no position open — ignored")
             return
 
-        proceeds = self.position_qty * price
-        cost_basis = self.position_qty * self.entry_price
+        qty = self.position_qty
+        entry = self.entry_price
+        proceeds = qty * price
+        cost_basis = qty * entry
         pnl = proceeds - cost_basis
         self.available_balance += proceeds
 
-        logger.info("SELL executed: price=%.2f qty=%.6f proceeds=%.2f pnl=%.2f", price, self.position_qty, proceeds, pnl)
+        logger.info("SELL executed: price=%.2f qty=%.6f proceeds=%.2f pnl=%.2f", price, qty, proceeds, pnl)
 
         # reset position
         self.in_position = False
@@ -282,9 +514,11 @@ class TradingBot:
         if emergency:
             # small debug note
             logger.debug("Emergency sell completed")
+        if self.on_sell is not None:
+            self.on_sell(price, qty, entry, emergency)
 
     # ============ Real order execution ============
-    def execute_buy(self, price: float):
+    async def execute_buy(self, price: float):
         """Place a real market buy order on the exchange."""
         if self.in_position:
             logger.warning("Attempt to buy while already in position — ignored")
@@ -293,12 +527,13 @@ class TradingBot:
         if not self._exchange:
             self._init_exchange()
 
-        # Refresh balance before buying
-        try:
-            self.fetch_balance()
-        except Exception:
-            logger.error("Could not refresh balance before buy")
-            return
+        # Refresh balance before buying, unless the user-data stream is keeping it live
+        if self._user_ws is None:
+            try:
+                await self.fetch_balance()
+            except Exception:
+                logger.error("Could not refresh balance before buy")
+                return
 
         amount_to_use = self.available_balance * self.trade_fraction
         if amount_to_use < 10:  # Binance min order ~10 USDT
@@ -312,7 +547,7 @@ class TradingBot:
 
         try:
             logger.info("Placing BUY order: %s qty=%.5f @ market", self.symbol, qty)
-            order = self._exchange.create_market_buy_order(self.symbol, qty)
+            order = await self._market_order("BUY", qty)
             
             # Extract filled info
             filled_qty = float(order.get("filled", qty))
@@ -323,10 +558,16 @@ class TradingBot:
             self.in_position = True
 
             logger.info("BUY filled: price=%.2f qty=%.6f order_id=%s", avg_price, filled_qty, order.get("id"))
+            self._failures = 0
         except Exception as e:
             logger.error("BUY order failed: %s", str(e))
+            self._record_failure()
+            return
+
+        if self.on_buy is not None:
+            self.on_buy(avg_price, filled_qty)
 
-    def execute_sell(self, price: float, emergency: bool = False):
+    async def execute_sell(self, price: float, emergency: bool = False):
         """Place a real market sell order on the exchange."""
         if not self.in_position:
             logger.warning("Attempt to sell but no position open — ignored")
@@ -342,12 +583,13 @@ class TradingBot:
 
         try:
             logger.info("Placing SELL order: %s qty=%.5f @ market", self.symbol, qty)
-            order = self._exchange.create_market_sell_order(self.symbol, qty)
+            order = await self._market_order("SELL", qty)
 
             filled_qty = float(order.get("filled", qty))
             avg_price = float(order.get("average", price))
+            entry = self.entry_price
             proceeds = filled_qty * avg_price
-            cost_basis = filled_qty * self.entry_price
+            cost_basis = filled_qty * entry
             pnl = proceeds - cost_basis
 
             logger.info("SELL filled: price=%.2f qty=%.6f pnl=%.2f order_id=%s", avg_price, filled_qty, pnl, order.get("id"))
@@ -359,58 +601,201 @@ class TradingBot:
 
             if emergency:
                 logger.debug("Emergency sell completed")
+            self._failures = 0
 
         except Exception as e:
             logger.error("SELL order failed: %s", str(e))
+            self._record_failure()
+            return
+
+        if self.on_sell is not None:
+            self.on_sell(avg_price, filled_qty, entry, emergency)
+
+    async def _market_order(self, side: str, qty: float):
+        """Market order via the direct REST client, or ccxt if that isn't set up."""
+        if self._rest is not None:
+            return await self._rest.market_order(self._market_id, side, qty)
+        if side == "BUY":
+            return await self._exchange.create_market_buy_order(self.symbol, qty)
+        return await self._exchange.create_market_sell_order(self.symbol, qty)
+
+    # ============ Price stream ============
+    def _stream_url(self):
+        base = TESTNET_STREAM_URL if self.testnet else STREAM_URL
+        return f"{base}/{self._market_id.lower()}@trade"
+
+    async def _stream_prices(self):
+        """Subscribe to the trade stream and feed every trade into process_price_tick."""
+        import aiohttp
+
+        url = self._stream_url()
+        async with self._http_session().ws_connect(url, heartbeat=30) as ws:
+            self._ws = ws
+            self._backoff_attempts = 0
+            self._retry_delay = 0.0
+            logger.info("Connected to price stream %s", url)
+            try:
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        continue
+                    price, ts = decode_trade(msg.data)
+                    self._last_price = price
+                    await self.process_price_tick(price, ts=ts)
+                    if not self._running:
+                        break
+            finally:
+                self._ws = None
+
+        if self._running:
+            raise ConnectionError("price stream closed by server")
+
+    async def _stream_forever(self, max_errors: int = 10):
+        """Keep the price stream connected, backing off between reconnects."""
+        while self._running:
+            try:
+                await self._stream_prices()
+            except Exception as e:
+                self._backoff_attempts += 1
+                delay = self._retry_delay = decorrelated_jitter(self._retry_delay)
+                logger.error("Price stream error (%d/%d): %s — reconnecting in %.1fs",
+                            self._backoff_attempts, max_errors, str(e), delay)
+
+                if self._backoff_attempts >= max_errors:
+                    logger.error("Too many consecutive errors, stopping bot")
+                    # stop() also closes the user-data socket, so run()'s gather can return
+                    self.stop()
+                    break
+
+                await self._sleep_unless_stopped(delay)
+
+    # ============ User-data stream (balance updates) ============
+    async def _stream_account(self):
+        """Follow the account's user-data stream so available_balance stays current."""
+        import aiohttp
+
+        listen_key = (await self._exchange.publicPostUserDataStream())["listenKey"]
+        base = TESTNET_STREAM_URL if self.testnet else STREAM_URL
+        keepalive = asyncio.ensure_future(self._keep_listen_key_alive(listen_key))
+        try:
+            async with self._http_session().ws_connect(f"{base}/{listen_key}", heartbeat=30) as ws:
+                self._user_ws = ws
+                logger.info("Connected to user-data stream")
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        continue
+                    event = json.loads(msg.data)
+                    if event.get("e") == "outboundAccountPosition":
+                        self._apply_account_update(event)
+                    if not self._running:
+                        break
+        finally:
+            self._user_ws = None
+            keepalive.cancel()
+
+        if self._running:
+            raise ConnectionError("user-data stream closed by server")
+
+    async def _keep_listen_key_alive(self, listen_key: str, interval: float = 30 * 60):
+        # Binance expires a listenKey after 60 minutes without a keepalive
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._exchange.publicPutUserDataStream({"listenKey": listen_key})
+            except Exception as e:
+                logger.warning("listenKey keepalive failed: %s", e)
+
+    def _apply_account_update(self, event: dict):
+        for entry in event.get("B", ()):
+            if entry.get("a") == "USDT":
+                self.available_balance = float(entry["f"])
+                self._balance_fetched_at = time.monotonic()
+
+    async def _stream_account_forever(self):
+        """Keep the user-data stream up; on failure the bot falls back to polling the balance."""
+        if not self.config.api_key:
+            return
+        delay = 0.0
+        while self._running:
+            try:
+                await self._stream_account()
+            except Exception as e:
+                delay = decorrelated_jitter(delay)
+                logger.warning("User-data stream error: %s — reconnecting in %.1fs", str(e), delay)
+                await self._sleep_unless_stopped(delay)
+
+    async def _report_status(self, interval: float):
+        """Periodic status line + balance refresh, alongside the stream."""
+        while self._running:
+            await self._sleep_unless_stopped(interval)
+            if not self._running:
+                break
+            await self.refresh_balance_if_stale()
+            if self._last_price is None or not self._log_enabled(logging.INFO):
+                continue
+            logger.info("Price: %.2f | Position: %s | Balance: %.2f USDT",
+                       self._last_price,
+                       f"YES @ {self.entry_price:.2f}" if self.in_position else "NO",
+                       self.available_balance)
+
+    async def _sleep_unless_stopped(self, delay: float):
+        """asyncio.sleep(delay), cut short by stop()."""
+        if self._stop_event is None:
+            await asyncio.sleep(delay)
+            return
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
 
     # ============ Main run loop ============
-    def run(self, poll_interval: float = 5.0):
-        """Main loop: poll price and run strategy."""
+    async def run(self, poll_interval: float = 5.0):
+        """Main loop: stream trade prices and run strategy on every trade.
+
+        poll_interval only paces the status log and balance refresh now —
+        prices are pushed by the websocket as they trade.
+        """
         if not self._exchange:
             self._init_exchange()
 
         # Fetch initial balance
         try:
-            self.fetch_balance()
+            await self.fetch_balance()
         except Exception as e:
             logger.error("Failed to fetch initial balance: %s", e)
             return
 
         self._running = True
-        logger.info("Starting price polling loop (interval=%.1fs)", poll_interval)
+        self._stop_event = asyncio.Event()
+        logger.info("Starting price stream (status every %.1fs)", poll_interval)
         print(f"Bot running. Watching {self.symbol}. Press Ctrl+C to stop.")
 
-        consecutive_errors = 0
-        max_errors = 10
-
-        while self._running:
-            try:
-                price = self.fetch_price()
-                logger.info("Price: %.2f | Position: %s | Balance: %.2f USDT",
-                           price,
-                           f"YES @ {self.entry_price:.2f}" if self.in_position else "NO",
-                           self.available_balance)
-
-                self.process_price_tick(price)
-                consecutive_errors = 0  # reset on success
-
-            except Exception as e:
-                consecutive_errors += 1
-                delay = exponential_backoff(consecutive_errors - 1)
-                logger.error("Error fetching price (%d/%d): %s — retrying in %.1fs",
-                            consecutive_errors, max_errors, str(e), delay)
-
-                if consecutive_errors >= max_errors:
-                    logger.error("Too many consecutive errors, stopping bot")
-                    break
-
-                time.sleep(delay)
-                continue
-
-            time.sleep(poll_interval)
+        await asyncio.gather(
+            self._stream_forever(),
+            self._stream_account_forever(),
+            self._report_status(poll_interval),
+        )
 
         logger.info("Bot stopped")
 
+    def stop(self):
+        """Ask the run loop to finish (safe to call from a signal handler on the loop)."""
+        self._running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+        # don't wait for the next message to notice we're stopping
+        for ws in (self._ws, self._user_ws):
+            if ws is not None:
+                asyncio.ensure_future(ws.close())
+
+    async def close(self):
+        """Close the exchange client and the shared HTTP session."""
+        if self._exchange:
+            await self._exchange.close()
+            self._exchange = None
+        if self._session:
+            await self._session.close()
+            self._session = None
+
     def health_check(self):
         """Simple health check — could be extended for real monitoring.
 
@@ -423,32 +808,43 @@ class TradingBot:
 
 
 def _handle_sigint(bot: TradingBot):
-    def _cb(signum, frame):
+    def _cb(signum, frame=None):
         logger.info("Received signal %s — shutting down", signum)
-        bot._running = False
+        bot.stop()
 
     return _cb
 
 
+async def _run_headless(bot: TradingBot, poll_interval: float):
+    # graceful shutdown
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, _handle_sigint(bot), sig)
+        except NotImplementedError:
+            # Windows event loops don't support add_signal_handler
+            signal.signal(sig, _handle_sigint(bot))
+
+    try:
+        await bot.run(poll_interval=poll_interval)
+    finally:
+        await bot.close()
+
+
 def main():
     import argparse
 
     parser = argparse.ArgumentParser(description="Momentum trading bot demo")
     parser.add_argument("--mainnet", action="store_true", help="Use mainnet (default: testnet)")
-    parser.add_argument("--interval", type=float, default=5.0, help="Price poll interval in seconds")
+    parser.add_argument("--interval", type=float, default=5.0, help="Status log interval in seconds")
     args = parser.parse_args()
 
-    config = get_config()
-    config["TESTNET"] = not args.mainnet
+    config = replace(get_config(), testnet=not args.mainnet)
 
     bot = TradingBot(config=config)
 
-    # graceful shutdown
-    signal.signal(signal.SIGINT, _handle_sigint(bot))
-    signal.signal(signal.SIGTERM, _handle_sigint(bot))
-
     # Run the bot
-    bot.run(poll_interval=args.interval)
+    run_async(_run_headless(bot, args.interval))
 
 
 if __name__ == "__main__":
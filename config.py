@@ -1,5 +1,6 @@
+import functools
 import os
-from typing import Dict
+from dataclasses import dataclass
 
 try:
     # optional helper for local dev
@@ -10,24 +11,52 @@ except Exception:
     pass
 
 
-def get_config() -> Dict:
+WINDOW_MODES = ("sliding", "tumbling")
+
+
+@dataclass(frozen=True, slots=True)
+class BotConfig:
+    """Bot settings. Immutable — use dataclasses.replace() for overrides."""
+
+    api_key: str = ""
+    api_secret: str = ""
+    testnet: bool = True
+
+    symbol: str = "BTC/USDT"
+
+    buy_drop_pct: float = 2.0       # Buy when price drops this %
+    take_profit_pct: float = 3.0    # Sell when profit reaches this %
+    stop_loss_pct: float = 5.0      # Sell when loss reaches this %
+    trade_fraction: float = 0.1     # % of balance per trade (0.1 = 10%)
+    lookback_minutes: int = 5       # Price window in minutes
+    window_mode: str = "sliding"    # "sliding" or "tumbling" (aligned to midnight CEST)
+
+    log_level: str = "INFO"
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> BotConfig:
     """Load configuration from environment variables.
 
-    Keep this minimal and easy to override.
+    Parsed once per process; call get_config.cache_clear() to re-read.
     """
-    conf = {
-        "API_KEY": os.getenv("BINANCE_API_KEY", ""),
-        "API_SECRET": os.getenv("BINANCE_API_SECRET", ""),
-        "TESTNET": os.getenv("TESTNET", "true").lower() in ("1", "true", "yes"),
-        
-        "SYMBOL": os.getenv("SYMBOL", "BTC/USDT"),
-        
-        "BUY_DROP_PCT": float(os.getenv("BUY_DROP_PCT", "2.0")),        # Buy when price drops this %
-        "TAKE_PROFIT_PCT": float(os.getenv("TAKE_PROFIT_PCT", "3.0")),  # Sell when profit reaches this %
-        "STOP_LOSS_PCT": float(os.getenv("STOP_LOSS_PCT", "5.0")),      # Sell when loss reaches this %
-        "TRADE_FRACTION": float(os.getenv("TRADE_FRACTION", "0.1")),    # % of balance per trade (0.1 = 10%)
-        "LOOKBACK_MINUTES": int(os.getenv("LOOKBACK_MINUTES", "5")),    # Price window in minutes
-        
-        "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO"),
-    }
-    return conf
+    window_mode = os.getenv("WINDOW_MODE", "sliding").lower()
+    if window_mode not in WINDOW_MODES:
+        raise ValueError(f"WINDOW_MODE must be one of {', '.join(WINDOW_MODES)}, got {window_mode!r}")
+
+    return BotConfig(
+        api_key=os.getenv("BINANCE_API_KEY", ""),
+        api_secret=os.getenv("BINANCE_API_SECRET", ""),
+        testnet=os.getenv("TESTNET", "true").lower() in ("1", "true", "yes"),
+
+        symbol=os.getenv("SYMBOL", "BTC/USDT"),
+
+        buy_drop_pct=float(os.getenv("BUY_DROP_PCT", "2.0")),
+        take_profit_pct=float(os.getenv("TAKE_PROFIT_PCT", "3.0")),
+        stop_loss_pct=float(os.getenv("STOP_LOSS_PCT", "5.0")),
+        trade_fraction=float(os.getenv("TRADE_FRACTION", "0.1")),
+        lookback_minutes=int(os.getenv("LOOKBACK_MINUTES", "5")),
+        window_mode=window_mode,
+
+        log_level=os.getenv("LOG_LEVEL", "INFO"),
+    )
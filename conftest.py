@@ -0,0 +1,32 @@
+import logging
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# set before test_bot imports bot (and with it the logger), so test runs write
+# their DEBUG tick lines to a throwaway dir instead of the real logs/bot.log
+_TMP_LOG_DIR = None
+if not os.getenv("LOG_DIR"):
+    _TMP_LOG_DIR = os.environ["LOG_DIR"] = tempfile.mkdtemp(prefix="momentum-bot-test-logs-")
+
+
+def pytest_unconfigure(config):
+    if _TMP_LOG_DIR is not None:
+        shutil.rmtree(_TMP_LOG_DIR, ignore_errors=True)
+
+
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_call(item):
+    """Flush the bot logger's queue before the test body's output is collected.
+
+    Records are written on the QueueListener thread; stopping it joins the
+    thread once the queue is empty, so a test's log lines land in its own
+    captured output instead of leaking out between capture phases.
+    """
+    yield
+    listener = getattr(logging.getLogger("momentum-bot"), "_listener", None)
+    if listener is not None:
+        listener.stop()
+        listener.start()
@@ -1,42 +1,71 @@
 # gui.py - Main GUI window for the trading bot
 # PyQt5 dashboard with real-time updates
 
+import asyncio
+import functools
 import sys
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import deque
+from dataclasses import replace
+from datetime import datetime
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QPushButton, QLabel, QComboBox, QLineEdit, QDialog,
     QFormLayout, QDoubleSpinBox, QSpinBox, QMessageBox,
-    QSplitter, QFrame, QSizePolicy, QGroupBox, QDialogButtonBox
+    QSplitter, QFrame, QSizePolicy, QGroupBox, QDialogButtonBox, QApplication
 )
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, pyqtSlot
-from PyQt5.QtGui import QFont
+from PyQt5.QtCore import (
+    Qt, QTimer, QThread, QObject, QRunnable, QSignalBlocker, QThreadPool, pyqtSignal, pyqtSlot
+)
+from PyQt5.QtGui import QFont, QGuiApplication
 
 from styles import DARK_THEME, COLORS
 from widgets import (
     BalancePanel, PositionPanel, PriceChartPanel,
-    TradeHistoryTable, LogPanel
+    TradeHistoryTable, LogPanel, Position, NO_POSITION, enable_opengl_charts
 )
 
 
 class BotWorker(QThread):
     
-    price_update = pyqtSignal(float)
-    trigger_update = pyqtSignal(float, float)
+    # one per refresh: price, balance (avail, in_pos_value, holdings or None) or None
+    # when nothing changed, position, trigger (ref, level) or None
+    tick_state = pyqtSignal(dict)
     balance_update = pyqtSignal(float, float, dict)
-    position_update = pyqtSignal(dict)
     trade_executed = pyqtSignal(dict)
+    trades_batch = pyqtSignal(list)
     log_message = pyqtSignal(str, str)
     status_changed = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, config=None):
         super().__init__(parent)
+        self.config = config  # BotConfig from the dashboard; settings overrides are applied on top
         self.bot = None
-        self._running = False
+        self._stop_event = threading.Event()
         self.symbol = "BTC/USDT"
         self.poll_interval = 5.0
         self.settings = {}
+        self._loop = None
+        # display-only signals are coalesced to the screen refresh rate
+        self._ui_min_interval = 1.0 / 60
+        self._last_ui_emit = 0.0
+        self._pending_ui = None
+        self._ui_flush_scheduled = False
+        # holdings only change on trades — re-fetch after one, or once the TTL runs out
+        self._bal_ttl = 30
+        self._bal_cache_time = 0.0
+        self._bal_dirty = True
+        # last balance sent to the GUI; unchanged values aren't re-emitted
+        self._last_holdings = None
+        self._last_holdings_key = None
+        self._last_balance = None
+        # TP/SL status line goes out at most every 30s (monotonic clock)
+        self._last_tpsl_log_mono = float('-inf')
+        # rolling max of polled prices over the lookback, as (monotonic time, price);
+        # prices decrease left to right so the max is always at [0]
+        self._max_deque = deque()
     
     def configure(self, symbol, timeframe, exchange, settings=None):
         self.symbol = symbol
@@ -45,35 +74,47 @@ class BotWorker(QThread):
         self.exchange = exchange
         if settings:
             self.settings = settings
+        screen = QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen else 0
+        self._ui_min_interval = 1.0 / (rate if rate > 0 else 60)
     
     def run(self):
         """Main bot loop - runs in separate thread"""
+        from bot import run_async
+        run_async(self._run())
+    
+    async def _run(self):
         from bot import TradingBot
-        from config import get_config
-        import time
         
-        self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._stop_event.clear()
+        self._max_deque.clear()
         self.status_changed.emit("Connecting...")
         self.log_message.emit("Initializing bot...", "INFO")
         
         try:
-            config = get_config()
+            config = self.config
+            if config is None:
+                from config import get_config
+                config = get_config()
             
             if self.settings:
+                overrides = {}
                 if self.settings.get('api_key'):
-                    config['API_KEY'] = self.settings['api_key']
+                    overrides['api_key'] = self.settings['api_key']
                 if self.settings.get('secret_key'):
-                    config['API_SECRET'] = self.settings['secret_key']
+                    overrides['api_secret'] = self.settings['secret_key']
                 if self.settings.get('buy_drop_pct'):
-                    config['BUY_DROP_PCT'] = self.settings['buy_drop_pct']
+                    overrides['buy_drop_pct'] = self.settings['buy_drop_pct']
                 if self.settings.get('take_profit_pct'):
-                    config['TAKE_PROFIT_PCT'] = self.settings['take_profit_pct']
+                    overrides['take_profit_pct'] = self.settings['take_profit_pct']
                 if self.settings.get('stop_loss_pct'):
-                    config['STOP_LOSS_PCT'] = self.settings['stop_loss_pct']
+                    overrides['stop_loss_pct'] = self.settings['stop_loss_pct']
                 if self.settings.get('trade_size_pct'):
-                    config['TRADE_FRACTION'] = self.settings['trade_size_pct'] / 100.0  # Convert from % to fraction
+                    overrides['trade_fraction'] = self.settings['trade_size_pct'] / 100.0  # Convert from % to fraction
                 if self.settings.get('lookback_minutes'):
-                    config['LOOKBACK_MINUTES'] = self.settings['lookback_minutes']
+                    overrides['lookback_minutes'] = self.settings['lookback_minutes']
+                config = replace(config, **overrides)
             
             self.bot = TradingBot(symbol=self.symbol, config=config)
             self.bot.window_seconds = self.window_seconds
@@ -84,50 +125,44 @@ class BotWorker(QThread):
                 "INFO"
             )
             
-            original_execute_buy = self.bot.execute_buy
-            original_execute_sell = self.bot.execute_sell
+            def on_buy(price, qty):
+                self.trade_executed.emit({
+                    'time': datetime.now(),
+                    'symbol': self.symbol,
+                    'side': 'BUY',
+                    'price': price,
+                    'quantity': qty,
+                    'pnl': None
+                })
+                self.log_message.emit(f"Bought {qty:.6f} @ ${price:,.2f}", "SUCCESS")
+                self._bal_dirty = True
             
-            def wrapped_buy(price):
-                original_execute_buy(price)
-                if self.bot.in_position:
-                    self.trade_executed.emit({
-                        'time': datetime.now(),
-                        'symbol': self.symbol,
-                        'side': 'BUY',
-                        'price': price,
-                        'quantity': self.bot.position_qty,
-                        'pnl': None
-                    })
-                    self.log_message.emit(f"Bought {self.bot.position_qty:.6f} @ ${price:,.2f}", "SUCCESS")
-            
-            def wrapped_sell(price, emergency=False):
-                entry = self.bot.entry_price
-                qty = self.bot.position_qty
-                original_execute_sell(price, emergency)
-                if not self.bot.in_position and entry:
-                    pnl = (price - entry) * qty
-                    pnl_pct = ((price - entry) / entry) * 100
-                    self.trade_executed.emit({
-                        'time': datetime.now(),
-                        'symbol': self.symbol,
-                        'side': 'SELL',
-                        'price': price,
-                        'quantity': qty,
-                        'pnl': pnl,
-                        'pnl_pct': pnl_pct
-                    })
-                    if emergency:
-                        self.log_message.emit(f"Stop-loss triggered: {pnl_pct:+.2f}%", "ERROR")
-                    else:
-                        self.log_message.emit(f"Position closed: {pnl_pct:+.2f}% profit", "SUCCESS")
+            def on_sell(price, qty, entry, emergency):
+                pnl = (price - entry) * qty
+                pnl_pct = ((price - entry) / entry) * 100
+                self.trade_executed.emit({
+                    'time': datetime.now(),
+                    'symbol': self.symbol,
+                    'side': 'SELL',
+                    'price': price,
+                    'quantity': qty,
+                    'pnl': pnl,
+                    'pnl_pct': pnl_pct
+                })
+                self._bal_dirty = True
+                if emergency:
+                    self.log_message.emit(f"Stop-loss triggered: {pnl_pct:+.2f}%", "ERROR")
+                else:
+                    self.log_message.emit(f"Position closed: {pnl_pct:+.2f}% profit", "SUCCESS")
             
-            self.bot.execute_buy = wrapped_buy
-            self.bot.execute_sell = wrapped_sell
+            # the bot calls these after each fill, whichever path placed the order
+            self.bot.on_buy = on_buy
+            self.bot.on_sell = on_sell
             
             self.bot._init_exchange()
-            self.bot.fetch_balance()
+            await self.bot.fetch_balance()
             
-            existing_pos = self.bot.fetch_open_position()
+            existing_pos = await self.bot.fetch_open_position()
             if existing_pos:
                 self.log_message.emit(
                     f"📊 Found existing position: {existing_pos['qty']:.6f} {existing_pos['asset']}",
@@ -138,12 +173,14 @@ class BotWorker(QThread):
                     "INFO"
                 )
             
-            recent_trades = self.bot.fetch_recent_trades(limit=5)
+            recent_trades = await self.bot.fetch_recent_trades(limit=5)
             if recent_trades:
                 self.log_message.emit(f"Loaded {len(recent_trades)} recent trades from exchange", "INFO")
+                # one signal for the whole backfill instead of one per trade
+                batch = []
                 for t in reversed(recent_trades):
                     trade_time = datetime.fromtimestamp(t['timestamp'] / 1000) if t.get('timestamp') else datetime.now()
-                    self.trade_executed.emit({
+                    batch.append({
                         'time': trade_time,
                         'symbol': t.get('symbol', self.symbol),
                         'side': t.get('side', '').upper(),
@@ -152,99 +189,289 @@ class BotWorker(QThread):
                         'pnl': None,
                         'pnl_pct': None
                     })
+                self.trades_batch.emit(batch)
             
             self.status_changed.emit("Running")
             self.log_message.emit(f"Bot started. Watching {self.symbol}", "SUCCESS")
             
-            holdings = self.bot.fetch_all_balances()
+            holdings = await self.bot.fetch_all_balances()
+            self._bal_cache_time = time.monotonic()
+            self._bal_dirty = False
             self.balance_update.emit(self.bot.available_balance, 0, holdings)
             
-            position_start = None
-            if self.bot.in_position:
-                position_start = datetime.now()
+            self._last_tpsl_log_mono = float('-inf')
+            
+            # monotonic start of the open position; duration text is re-formatted
+            # only when the whole-second count changes
+            self._pos_start_mono = time.monotonic() if self.bot.in_position else None
+            self._last_dur_secs = -1
+            self._last_dur_str = "0:00:00"
             
-            while self._running:
+            while not self._stop_event.is_set():
                 try:
-                    price = self.bot.fetch_price()
-                    self.price_update.emit(price)
+                    # one monotonic read per poll, shared by every interval check below
+                    now = time.monotonic()
+                    if self._bal_dirty or now - self._bal_cache_time >= self._bal_ttl:
+                        price, holdings = await asyncio.gather(
+                            self.bot.fetch_price(), self.bot.fetch_all_balances()
+                        )
+                        self._bal_cache_time = now
+                        self._bal_dirty = False
+                    else:
+                        price = await self.bot.fetch_price()
+                    max_q = self._max_deque
+                    while max_q and max_q[-1][1] <= price:
+                        max_q.pop()
+                    max_q.append((now, price))
+                    cutoff = now - self.window_seconds
+                    while max_q[0][0] < cutoff:
+                        max_q.popleft()
                     
-                    holdings = self.bot.fetch_all_balances()
+                    bot = self.bot
+                    in_position = bot.in_position
+                    entry = bot.entry_price
+                    qty = bot.position_qty
                     
                     in_pos_value = 0
-                    if self.bot.in_position:
-                        in_pos_value = self.bot.position_qty * price
-                        if position_start is None:
-                            position_start = datetime.now()
+                    if in_position:
+                        in_pos_value = qty * price
+                        if self._pos_start_mono is None:
+                            self._pos_start_mono = now
                     else:
-                        position_start = None
+                        self._pos_start_mono = None
                     
-                    self.balance_update.emit(self.bot.available_balance, in_pos_value, holdings)
+                    balance = (bot.available_balance, in_pos_value, holdings)
+                    trigger = None
                     
-                    if self.bot.in_position:
-                        pnl_usd = (price - self.bot.entry_price) * self.bot.position_qty
-                        pnl_pct = ((price - self.bot.entry_price) / self.bot.entry_price) * 100
-                        duration = str(datetime.now() - position_start).split('.')[0] if position_start else "0:00:00"
+                    if in_position:
+                        pnl_usd = (price - entry) * qty
+                        pnl_pct = ((price - entry) / entry) * 100
+                        secs = int(now - self._pos_start_mono)
+                        if secs != self._last_dur_secs:
+                            h, rem = divmod(secs, 3600)
+                            m, sec = divmod(rem, 60)
+                            self._last_dur_secs = secs
+                            self._last_dur_str = f"{h}:{m:02d}:{sec:02d}"
+                        duration = self._last_dur_str
                         
-                        tp_price = self.bot.entry_price * (1 + self.bot.profit_target_pct / 100)
-                        sl_price = self.bot.entry_price * (1 - self.bot.stop_loss_pct / 100)
+                        # kept current by the bot whenever the entry or TP/SL % change
+                        tp_price = bot.take_profit_price
+                        sl_price = bot.stop_loss_price
                         
                         # Log TP/SL status occasionally (every ~30 seconds)
-                        if not hasattr(self, '_last_tpsl_log') or (datetime.now() - self._last_tpsl_log).seconds >= 30:
-                            self._last_tpsl_log = datetime.now()
+                        if now - self._last_tpsl_log_mono >= 30:
+                            self._last_tpsl_log_mono = now
                             self.log_message.emit(
-                                f"📊 PnL: {pnl_pct:+.2f}% | TP at {self.bot.profit_target_pct}% (${tp_price:,.2f}) | SL at -{self.bot.stop_loss_pct}% (${sl_price:,.2f})",
+                                f"📊 PnL: {pnl_pct:+.2f}% | TP at {bot.profit_target_pct}% (${tp_price:,.2f}) | SL at -{bot.stop_loss_pct}% (${sl_price:,.2f})",
                                 "INFO"
                             )
                         
-                        self.position_update.emit({
-                            'in_position': True,
-                            'symbol': self.symbol,
-                            'entry': self.bot.entry_price,
-                            'current': price,
-                            'qty': self.bot.position_qty,
-                            'pnl_pct': pnl_pct,
-                            'pnl_usd': pnl_usd,
-                            'duration': duration,
-                            'take_profit': tp_price,
-                            'stop_loss': sl_price
-                        })
+                        # immutable, so it can go to the GUI thread as-is (PyQt doesn't copy)
+                        position = Position(True, self.symbol, entry, price, qty, pnl_pct,
+                                            pnl_usd, duration, tp_price, sl_price)
                     else:
-                        self.position_update.emit({'in_position': False})
+                        position = NO_POSITION
                         
-                        if hasattr(self.bot, 'price_history') and len(self.bot.price_history) > 0:
-                            ref_price = max(p for _, p in self.bot.price_history)
-                            trigger_price = ref_price * (1 - self.bot.buy_drop_pct / 100)
-                            self.trigger_update.emit(ref_price, trigger_price)
+                        ref_price = max_q[0][1]
+                        trigger = (ref_price, ref_price * (1 - bot.buy_drop_pct / 100))
                     
-                    self.bot.process_price_tick(price)
+                    self._emit_ui(price, balance, position, trigger)
+                    
+                    await self.bot.process_price_tick(price)
                     
                 except Exception as e:
                     self.log_message.emit(f"Error: {str(e)}", "ERROR")
                 
-                for _ in range(int(self.poll_interval * 10)):
-                    if not self._running:
-                        break
-                    time.sleep(0.1)
+                # sleep until the next poll, waking straight away on stop();
+                # the wait runs in the default executor so the loop stays free
+                if await self._loop.run_in_executor(None, self._stop_event.wait, self.poll_interval):
+                    break
             
         except Exception as e:
             self.error_occurred.emit(str(e))
             self.log_message.emit(f"Bot error: {str(e)}", "ERROR")
         
+        self._pending_ui = None
+        if self.bot:
+            await self.bot.close()
+        self._loop = None
+        
         self.status_changed.emit("Stopped")
         self.log_message.emit("Bot stopped", "WARNING")
     
+    def _emit_ui(self, price, balance, position, trigger):
+        """Queue the latest display values; emit now, or once the refresh interval is up.
+
+        Trades and log messages don't go through here — they're never dropped.
+        """
+        self._pending_ui = (price, balance, position, trigger)
+        wait = self._last_ui_emit + self._ui_min_interval - time.monotonic()
+        if wait <= 0:
+            self._flush_ui()
+        elif not self._ui_flush_scheduled:
+            # trailing emit so the last values still reach the screen
+            self._ui_flush_scheduled = True
+            self._loop.call_later(wait, self._flush_ui)
+    
+    def _flush_ui(self):
+        self._ui_flush_scheduled = False
+        pending, self._pending_ui = self._pending_ui, None
+        if pending is None:
+            return
+        self._last_ui_emit = time.monotonic()
+        price, balance, position, trigger = pending
+        # a single queued call into the GUI thread instead of one per panel
+        self.tick_state.emit({
+            'price': price,
+            'balance': self._balance_delta(*balance),
+            'position': position,
+            'trigger': trigger,
+        })
+    
+    def _balance_delta(self, available, in_pos_value, holdings):
+        """Balance tuple for the GUI, or None if it matches the last one sent.
+
+        Holdings go out only when their contents change so the panel doesn't
+        rebuild its list every poll.
+        """
+        if holdings is not self._last_holdings:
+            # a re-fetch returns a new dict even when nothing moved
+            self._last_holdings = holdings
+            key = tuple(sorted(holdings.items())) if holdings else ()
+            if key != self._last_holdings_key:
+                self._last_holdings_key = key
+                self._last_balance = None
+        last = self._last_balance
+        if (last is not None and abs(available - last[0]) < 1e-9
+                and abs(in_pos_value - last[1]) < 1e-9):
+            return None
+        self._last_balance = (available, in_pos_value)
+        return (available, in_pos_value, holdings if last is None else None)
+    
+    def sell_now(self, price):
+        """Schedule a market sell on the worker's event loop (safe to call from the GUI thread)"""
+        if self._loop is None or not self.bot:
+            return None
+        return asyncio.run_coroutine_threadsafe(self.bot.execute_sell(price), self._loop)
+    
+    def apply_settings(self, settings):
+        """Hand new strategy settings to the running bot (safe to call from any thread).
+
+        They're applied on the worker's event loop, between ticks, rather than
+        from the calling thread while a tick is being processed.
+        """
+        loop = self._loop
+        if loop is None or not self.bot:
+            return False
+        loop.call_soon_threadsafe(self._apply_settings, settings)
+        return True
+    
+    def _apply_settings(self, settings):
+        bot = self.bot
+        if bot is None:
+            return
+        bot.buy_drop_pct = settings['buy_drop_pct']
+        bot.profit_target_pct = settings['take_profit_pct']
+        bot.stop_loss_pct = settings['stop_loss_pct']
+        bot.trade_fraction = settings['trade_size_pct'] / 100.0
+        bot.window_seconds = settings['lookback_minutes'] * 60
+        self.log_message.emit("✅ Settings applied to running bot!", "SUCCESS")
+    
     def stop(self):
-        self._running = False
+        self._stop_event.set()
+
+
+class PairRefreshSignals(QObject):
+    pairs_ready = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+
+class PairRefreshTask(QRunnable):
+    """Loads the exchange's USDT pairs on the thread pool so the UI doesn't freeze"""
+    
+    def __init__(self, api_key, api_secret, testnet):
+        super().__init__()
+        self.signals = PairRefreshSignals()
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+    
+    def run(self):
+        try:
+            import ccxt
+            exchange = ccxt.binance({
+                'apiKey': self.api_key,
+                'secret': self.api_secret,
+            })
+            if self.testnet:
+                exchange.set_sandbox_mode(True)
+            
+            markets = exchange.load_markets()
+            self.signals.pairs_ready.emit(sorted([s for s in markets.keys() if s.endswith('/USDT')]))
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class PreloadTask(QRunnable):
+    """Imports ccxt/bot and compiles the tick kernels in the background at startup,
+    so the first Refresh or Start click doesn't pay for it.
+    
+    then, if given, is called from the pool thread once the kernels are built.
+    """
+    
+    def __init__(self, buy_drop_pct, then=None):
+        super().__init__()
+        self.buy_drop_pct = buy_drop_pct
+        self.then = then
+    
+    def run(self):
+        try:
+            import ccxt  # noqa: F401
+            import bot  # noqa: F401
+            from strategy_kernel import make_entry_check, make_sliding_tick
+            make_entry_check(self.buy_drop_pct)
+            make_sliding_tick(self.buy_drop_pct)
+        except Exception:
+            pass  # the real import/compile reports the error where it's used
+        if self.then is not None:
+            self.then()
 
 
 class SettingsDialog(QDialog):
     """Settings dialog for API keys and trading parameters"""
     
+    # group title -> rows; each row becomes a label + spinbox stored in self._inputs[key]
+    SPECS = (
+        ("📉 When to BUY (Entry Signal)", (
+            {'key': 'buy_drop_pct', 'label': "Buy when price drops by:", 'type': 'double',
+             'range': (0.1, 20.0), 'step': 0.1, 'decimals': 1, 'suffix': " %", 'default': 2.0,
+             'tooltip': "Bot will buy when price drops this much from the lookback window high"},
+            {'key': 'lookback_minutes', 'label': "Price lookback window:", 'type': 'int',
+             'range': (1, 60), 'suffix': " minutes", 'default': 5,
+             'tooltip': "How far back to look for the reference price"},
+        )),
+        ("📈 When to SELL (Exit Signal)", (
+            {'key': 'take_profit_pct', 'label': "Take profit at:", 'type': 'double',
+             'range': (0.5, 50.0), 'step': 0.5, 'decimals': 1, 'suffix': " %", 'default': 3.0,
+             'tooltip': "Sell when profit reaches this percentage", 'role': "profit"},
+            {'key': 'stop_loss_pct', 'label': "Stop loss at:", 'type': 'double',
+             'range': (0.5, 50.0), 'step': 0.5, 'decimals': 1, 'suffix': " %", 'default': 5.0,
+             'tooltip': "Sell to cut losses at this percentage", 'role': "loss"},
+        )),
+        ("💰 Position Sizing", (
+            {'key': 'trade_size_pct', 'label': "Use per trade:", 'type': 'double',
+             'range': (1, 100), 'step': 1, 'decimals': 0, 'suffix': " % of balance", 'default': 10.0,
+             'tooltip': "Percentage of available balance to use for each trade"},
+        )),
+    )
+    
     def __init__(self, parent=None, current_settings=None):
         super().__init__(parent)
         self.setWindowTitle("Trading Settings")
         self.setMinimumWidth(500)
-        self.setStyleSheet(DARK_THEME)
+        if parent is None and not QApplication.instance().styleSheet():
+            # normally run_gui() sets the theme app-wide; don't parse it twice
+            self.setStyleSheet(DARK_THEME)
         
         settings = current_settings or {}
         
@@ -268,74 +495,16 @@ class SettingsDialog(QDialog):
         
         layout.addWidget(api_group)
         
-        buy_group = QGroupBox("📉 When to BUY (Entry Signal)")
-        buy_layout = QFormLayout(buy_group)
-        
-        self.buy_drop_input = QDoubleSpinBox()
-        self.buy_drop_input.setRange(0.1, 20.0)
-        self.buy_drop_input.setSingleStep(0.1)
-        self.buy_drop_input.setDecimals(1)
-        self.buy_drop_input.setValue(settings.get('buy_drop_pct', 2.0))
-        self.buy_drop_input.setSuffix(" %")
-        buy_drop_label = QLabel("Buy when price drops by:")
-        buy_drop_label.setToolTip("Bot will buy when price drops this much from the lookback window high")
-        buy_layout.addRow(buy_drop_label, self.buy_drop_input)
-        
-        self.lookback_input = QSpinBox()
-        self.lookback_input.setRange(1, 60)
-        self.lookback_input.setValue(settings.get('lookback_minutes', 5))
-        self.lookback_input.setSuffix(" minutes")
-        lookback_label = QLabel("Price lookback window:")
-        lookback_label.setToolTip("How far back to look for the reference price")
-        buy_layout.addRow(lookback_label, self.lookback_input)
-        
-        layout.addWidget(buy_group)
-        
-        sell_group = QGroupBox("📈 When to SELL (Exit Signal)")
-        sell_layout = QFormLayout(sell_group)
-        
-        self.take_profit_input = QDoubleSpinBox()
-        self.take_profit_input.setRange(0.5, 50.0)
-        self.take_profit_input.setSingleStep(0.5)
-        self.take_profit_input.setDecimals(1)
-        self.take_profit_input.setValue(settings.get('take_profit_pct', 3.0))
-        self.take_profit_input.setSuffix(" %")
-        tp_label = QLabel("Take profit at:")
-        tp_label.setToolTip("Sell when profit reaches this percentage")
-        tp_label.setStyleSheet("color: #00ff00;")
-        sell_layout.addRow(tp_label, self.take_profit_input)
-        
-        self.stop_loss_input = QDoubleSpinBox()
-        self.stop_loss_input.setRange(0.5, 50.0)
-        self.stop_loss_input.setSingleStep(0.5)
-        self.stop_loss_input.setDecimals(1)
-        self.stop_loss_input.setValue(settings.get('stop_loss_pct', 5.0))
-        self.stop_loss_input.setSuffix(" %")
-        sl_label = QLabel("Stop loss at:")
-        sl_label.setToolTip("Sell to cut losses at this percentage")
-        sl_label.setStyleSheet("color: #ff4444;")
-        sell_layout.addRow(sl_label, self.stop_loss_input)
-        
-        layout.addWidget(sell_group)
-        
-        # === Position Size Section ===
-        size_group = QGroupBox("💰 Position Sizing")
-        size_layout = QFormLayout(size_group)
-        
-        self.trade_size_input = QDoubleSpinBox()
-        self.trade_size_input.setRange(1, 100)
-        self.trade_size_input.setSingleStep(1)
-        self.trade_size_input.setDecimals(0)
-        self.trade_size_input.setValue(settings.get('trade_size_pct', 10.0))
-        self.trade_size_input.setSuffix(" % of balance")
-        size_label = QLabel("Use per trade:")
-        size_label.setToolTip("Percentage of available balance to use for each trade")
-        size_layout.addRow(size_label, self.trade_size_input)
-        
-        layout.addWidget(size_group)
+        self._inputs = {}
+        for title, rows in self.SPECS:
+            group = QGroupBox(title)
+            group_layout = QFormLayout(group)
+            for spec in rows:
+                self._add_row(group_layout, spec, settings.get(spec['key'], spec['default']))
+            layout.addWidget(group)
         
         info_label = QLabel("💡 Settings apply immediately to running bot")
-        info_label.setStyleSheet("color: #00ff00; font-style: italic; padding: 8px;")
+        info_label.setProperty("role", "hint")
         layout.addWidget(info_label)
         
         btn_layout = QHBoxLayout()
@@ -353,16 +522,31 @@ class SettingsDialog(QDialog):
         
         layout.addLayout(btn_layout)
     
+    def _add_row(self, form, spec, value):
+        if spec['type'] == 'double':
+            widget = QDoubleSpinBox()
+            widget.setSingleStep(spec['step'])
+            widget.setDecimals(spec['decimals'])
+        else:
+            widget = QSpinBox()
+        widget.setRange(*spec['range'])
+        widget.setValue(value)
+        widget.setSuffix(spec['suffix'])
+        
+        label = QLabel(spec['label'])
+        label.setToolTip(spec['tooltip'])
+        if 'role' in spec:
+            label.setProperty("role", spec['role'])
+        form.addRow(label, widget)
+        self._inputs[spec['key']] = widget
+    
     def get_settings(self):
-        return {
+        settings = {
             'api_key': self.api_key_input.text(),
             'secret_key': self.secret_key_input.text(),
-            'buy_drop_pct': self.buy_drop_input.value(),
-            'lookback_minutes': self.lookback_input.value(),
-            'take_profit_pct': self.take_profit_input.value(),
-            'stop_loss_pct': self.stop_loss_input.value(),
-            'trade_size_pct': self.trade_size_input.value(),
         }
+        settings.update({key: widget.value() for key, widget in self._inputs.items()})
+        return settings
 
 
 class TradingDashboard(QMainWindow):
@@ -372,32 +556,56 @@ class TradingDashboard(QMainWindow):
         super().__init__()
         self.setWindowTitle("Momentum Trader")
         self.setMinimumSize(1000, 700)
-        self.setStyleSheet(DARK_THEME)
+        if not QApplication.instance().styleSheet():
+            # embedded without run_gui(): theme just this window
+            self.setStyleSheet(DARK_THEME)
         
         # Bot worker thread
         self.worker = None
         self.is_running = False
+        self._stopping = False
+        
+        # latest balance/position/trigger and queued worker log lines, applied together
+        # at most every 50ms instead of repainting the panels per signal
+        self._pending = {'balance': None, 'position': None, 'trigger': None, 'logs': []}
+        self._pending_timer = QTimer(self)
+        self._pending_timer.setSingleShot(True)
+        self._pending_timer.setInterval(50)
+        self._pending_timer.timeout.connect(self._flush_pending)
+        # last Position shown; an identical snapshot skips the panel update
+        self._last_position = None
+        # error dialog, built on first use and reused after that
+        self._error_box = None
+        self._error_shown = False
+        
+        # USDT pairs from load_markets(), reused for an hour
+        self._markets_cache = None
+        self._markets_cache_time = None
+        self._markets_ttl = 3600
+        self._pairs_task = None
         
         # Trading settings (loaded from config, can be changed via GUI)
         from config import get_config
-        config = get_config()
+        self._config = config = get_config()
         self.trading_settings = {
-            'api_key': config.get('API_KEY', ''),
-            'secret_key': config.get('API_SECRET', ''),
-            'buy_drop_pct': config.get('BUY_DROP_PCT', 2.0),
-            'lookback_minutes': config.get('LOOKBACK_MINUTES', 5),
-            'take_profit_pct': config.get('TAKE_PROFIT_PCT', 3.0),
-            'stop_loss_pct': config.get('STOP_LOSS_PCT', 5.0),
-            'trade_size_pct': config.get('TRADE_FRACTION', 0.1) * 100,  # Convert to percentage
+            'api_key': config.api_key,
+            'secret_key': config.api_secret,
+            'buy_drop_pct': config.buy_drop_pct,
+            'lookback_minutes': config.lookback_minutes,
+            'take_profit_pct': config.take_profit_pct,
+            'stop_loss_pct': config.stop_loss_pct,
+            'trade_size_pct': config.trade_fraction * 100,  # Convert to percentage
         }
         
+        # warm up heavy imports off the GUI thread — on a pool of its own so a
+        # pair refresh doesn't queue behind it on single-core machines
+        self._preload_pool = QThreadPool(self)
+        self._preload_pool.setMaxThreadCount(1)
+        self._preload_pool.start(PreloadTask(config.buy_drop_pct))
+        
         # Build UI
         self._setup_ui()
         
-        # Update timer for UI refresh
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self._on_timer_tick)
-        
         # Current state
         self.current_price = 0
         self.entry_price = None
@@ -447,45 +655,19 @@ class TradingDashboard(QMainWindow):
         
         # Exchange dropdown with proper styling
         exchange_label = QLabel("Exchange:")
-        exchange_label.setStyleSheet("color: #888; margin-left: 10px;")
+        exchange_label.setProperty("role", "toolbar")
         layout.addWidget(exchange_label)
         
         self.exchange_combo = QComboBox()
         self.exchange_combo.setMinimumWidth(100)
-        self.exchange_combo.setStyleSheet("""
-            QComboBox {
-                background: #2a2a2a;
-                border: 1px solid #444;
-                border-radius: 4px;
-                padding: 5px 10px;
-                color: white;
-                min-height: 28px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 25px;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 5px solid transparent;
-                border-right: 5px solid transparent;
-                border-top: 6px solid #888;
-                margin-right: 5px;
-            }
-            QComboBox QAbstractItemView {
-                background: #2a2a2a;
-                border: 1px solid #555;
-                selection-background-color: #3a6ea5;
-                color: white;
-            }
-        """)
+        self.exchange_combo.setObjectName("dark-combo")  # styled in DARK_THEME
         self.exchange_combo.addItems(["Binance", "Bybit", "KuCoin"])
         self.exchange_combo.currentTextChanged.connect(self._on_exchange_changed)
         layout.addWidget(self.exchange_combo)
         
         # Pair dropdown with proper styling
         pair_label = QLabel("Pair:")
-        pair_label.setStyleSheet("color: #888; margin-left: 10px;")
+        pair_label.setProperty("role", "toolbar")
         layout.addWidget(pair_label)
         
         self.pair_combo = QComboBox()
@@ -493,42 +675,7 @@ class TradingDashboard(QMainWindow):
         self.pair_combo.setMinimumWidth(150)
         self.pair_combo.setMaxVisibleItems(15)
         self.pair_combo.setInsertPolicy(QComboBox.NoInsert)
-        self.pair_combo.setStyleSheet("""
-            QComboBox {
-                background: #2a2a2a;
-                border: 1px solid #444;
-                border-radius: 4px;
-                padding: 5px 10px;
-                color: white;
-                min-height: 28px;
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 25px;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 5px solid transparent;
-                border-right: 5px solid transparent;
-                border-top: 6px solid #888;
-                margin-right: 5px;
-            }
-            QComboBox QAbstractItemView {
-                background: #2a2a2a;
-                border: 1px solid #555;
-                selection-background-color: #3a6ea5;
-                color: white;
-                padding: 5px;
-                outline: none;
-            }
-            QComboBox QAbstractItemView::item {
-                min-height: 28px;
-                padding: 5px;
-            }
-            QComboBox QAbstractItemView::item:hover {
-                background: #3a6ea5;
-            }
-        """)
+        self.pair_combo.setObjectName("dark-combo")
         self.pair_combo.addItems([
             "BTC/USDT", "ETH/USDT", "BNB/USDT", "SOL/USDT", "XRP/USDT",
             "DOGE/USDT", "ADA/USDT", "AVAX/USDT", "DOT/USDT", "MATIC/USDT",
@@ -548,6 +695,8 @@ class TradingDashboard(QMainWindow):
         
         self.status_label = QLabel("● Stopped")
         self.status_label.setObjectName("status-stopped")
+        self._current_status = "Stopped"
+        self._status_names = {"Running": "status-running", "Stopped": "status-stopped"}
         layout.addWidget(self.status_label)
         
         layout.addStretch()
@@ -563,31 +712,45 @@ class TradingDashboard(QMainWindow):
         self.log_panel.log(f"Exchange changed to {exchange}", "INFO")
     
     def _refresh_pairs(self):
+        config = self._config
+        
+        cached = self._markets_cache
+        if (cached and cached[0] == config.testnet
+                and time.monotonic() - self._markets_cache_time < self._markets_ttl):
+            self._apply_pairs(cached[1])
+            return
+        if self._pairs_task is not None:
+            return  # already fetching
+        
         self.log_panel.log("Fetching available pairs...", "INFO")
-        try:
-            import ccxt
-            from config import get_config
-            config = get_config()
-            
-            exchange = ccxt.binance({
-                'apiKey': config.get('API_KEY', ''),
-                'secret': config.get('API_SECRET', ''),
-            })
-            if config.get('TESTNET', True):
-                exchange.set_sandbox_mode(True)
-            
-            markets = exchange.load_markets()
-            usdt_pairs = sorted([s for s in markets.keys() if s.endswith('/USDT')])
-            
-            current = self.pair_combo.currentText()
-            self.pair_combo.clear()
-            self.pair_combo.addItems(usdt_pairs[:50])
-            if current in usdt_pairs:
-                self.pair_combo.setCurrentText(current)
-            
-            self.log_panel.log(f"Loaded {len(usdt_pairs)} USDT pairs", "SUCCESS")
-        except Exception as e:
-            self.log_panel.log(f"Failed to fetch pairs: {str(e)}", "ERROR")
+        task = PairRefreshTask(config.api_key, config.api_secret, config.testnet)
+        task.signals.pairs_ready.connect(lambda pairs: self._on_pairs_ready(config.testnet, pairs))
+        task.signals.failed.connect(self._on_pairs_failed)
+        self._pairs_task = task
+        QThreadPool.globalInstance().start(task)
+    
+    def _on_pairs_ready(self, testnet, usdt_pairs):
+        self._pairs_task = None
+        self._markets_cache = (testnet, usdt_pairs)
+        self._markets_cache_time = time.monotonic()
+        self._apply_pairs(usdt_pairs)
+    
+    @pyqtSlot(str)
+    def _on_pairs_failed(self, error):
+        self._pairs_task = None
+        self.log_panel.log(f"Failed to fetch pairs: {error}", "ERROR")
+    
+    def _apply_pairs(self, usdt_pairs):
+        current = self.pair_combo.currentText()
+        # no currentTextChanged/currentIndexChanged storm while repopulating
+        blocker = QSignalBlocker(self.pair_combo)
+        self.pair_combo.clear()
+        self.pair_combo.addItems(usdt_pairs[:50])
+        if current in usdt_pairs:
+            self.pair_combo.setCurrentText(current)
+        blocker.unblock()
+        
+        self.log_panel.log(f"Loaded {len(usdt_pairs)} USDT pairs", "SUCCESS")
     
     def _create_panels(self):
         splitter = QSplitter(Qt.Horizontal)
@@ -624,8 +787,8 @@ class TradingDashboard(QMainWindow):
             self._start_bot()
     
     def _start_bot(self):
-        if self.worker and self.worker.isRunning():
-            return
+        if self.worker:
+            return  # still running or winding down
         
         # Calculate timeframe from lookback setting
         lookback = self.trading_settings.get('lookback_minutes', 5)
@@ -638,7 +801,7 @@ class TradingDashboard(QMainWindow):
         else:
             timeframe = '1h'
         
-        self.worker = BotWorker()
+        self.worker = BotWorker(config=self._config)
         self.worker.configure(
             symbol=self.pair_combo.currentText(),
             timeframe=timeframe,
@@ -647,14 +810,14 @@ class TradingDashboard(QMainWindow):
         )
         
         # Connect signals
-        self.worker.price_update.connect(self._on_price_update)
-        self.worker.trigger_update.connect(self._on_trigger_update)
+        self.worker.tick_state.connect(self._on_tick_state)
         self.worker.balance_update.connect(self._on_balance_update)
-        self.worker.position_update.connect(self._on_position_update)
         self.worker.trade_executed.connect(self._on_trade_executed)
+        self.worker.trades_batch.connect(self._on_trades_batch)
         self.worker.log_message.connect(self._on_log_message)
         self.worker.status_changed.connect(self._on_status_changed)
         self.worker.error_occurred.connect(self._on_error)
+        self.worker.finished.connect(self._on_worker_finished)
         
         self.worker.start()
         
@@ -665,16 +828,32 @@ class TradingDashboard(QMainWindow):
         
         self.exchange_combo.setEnabled(False)
         self.pair_combo.setEnabled(False)
-        
-        self.update_timer.start(1000)
     
     def _stop_bot(self):
-        if self.worker:
+        """Ask the worker to stop; the UI is reset from _on_worker_finished"""
+        if self._stopping:
+            return
+        if self.worker and self.worker.isRunning():
+            self._stopping = True
+            self.start_btn.setText("Stopping...")
+            self.start_btn.setEnabled(False)
             self.worker.stop()
-            self.worker.wait(2000)
+            return
+        self._on_worker_finished()
+    
+    @pyqtSlot()
+    def _on_worker_finished(self):
+        # apply what the worker sent last before resetting the controls
+        self._pending_timer.stop()
+        self._flush_pending()
+        self._last_position = None  # the reset below changes the sell button
+        if self.worker:
+            self.worker.deleteLater()
             self.worker = None
+        self._stopping = False
         
         self.is_running = False
+        self.start_btn.setEnabled(True)
         self.start_btn.setText("Start")
         self.start_btn.setObjectName("start")
         self.start_btn.setStyle(self.start_btn.style())
@@ -683,8 +862,6 @@ class TradingDashboard(QMainWindow):
         
         self.exchange_combo.setEnabled(True)
         self.pair_combo.setEnabled(True)
-        
-        self.update_timer.stop()
     
     def _manual_sell(self):
         if not self.worker or not self.worker.bot:
@@ -707,7 +884,7 @@ class TradingDashboard(QMainWindow):
         if reply == QMessageBox.Yes:
             self.log_panel.log("Manual sell initiated...", "WARNING")
             try:
-                self.worker.bot.execute_sell(self.current_price)
+                self.worker.sell_now(self.current_price)
                 self.sell_btn.setEnabled(False)
             except Exception as e:
                 self.log_panel.log(f"Sell failed: {str(e)}", "ERROR")
@@ -719,12 +896,12 @@ class TradingDashboard(QMainWindow):
             self.trading_settings.update(settings)
             
             if self.worker and self.worker.bot:
-                self.worker.bot.buy_drop_pct = settings['buy_drop_pct']
-                self.worker.bot.profit_target_pct = settings['take_profit_pct']
-                self.worker.bot.stop_loss_pct = settings['stop_loss_pct']
-                self.worker.bot.trade_fraction = settings['trade_size_pct'] / 100.0
-                self.worker.bot.window_seconds = settings['lookback_minutes'] * 60
-                self.log_panel.log("✅ Settings applied to running bot!", "SUCCESS")
+                # a new buy threshold means new compiled kernels: build them on the
+                # preload pool, then the worker swaps the settings in on its own loop
+                self._preload_pool.start(PreloadTask(
+                    settings['buy_drop_pct'],
+                    then=functools.partial(self.worker.apply_settings, settings),
+                ))
             
             self.log_panel.log(
                 f"Buy at {settings['buy_drop_pct']}% drop | "
@@ -733,12 +910,46 @@ class TradingDashboard(QMainWindow):
                 "INFO"
             )
     
-    @pyqtSlot(float)
+    @pyqtSlot(dict)
+    def _on_tick_state(self, state):
+        self._on_price_update(state['price'])
+        balance = state['balance']
+        if balance is not None:
+            prev = self._pending['balance']
+            if balance[2] is None and prev is not None:
+                # holdings only come with the update where they changed; keep
+                # that one if it hasn't been flushed yet
+                balance = (balance[0], balance[1], prev[2])
+            self._pending['balance'] = balance
+        self._pending['position'] = state['position']
+        if state['trigger'] is not None:
+            self._pending['trigger'] = state['trigger']
+        self._schedule_flush()
+    
     def _on_price_update(self, price):
         self.current_price = price
+        # the panel coalesces its own redraws
         self.chart_panel.add_price(price)
     
-    @pyqtSlot(float, float)
+    def _schedule_flush(self):
+        if not self._pending_timer.isActive():
+            self._pending_timer.start()
+    
+    def _flush_pending(self):
+        pending = self._pending
+        balance, pending['balance'] = pending['balance'], None
+        position, pending['position'] = pending['position'], None
+        trigger, pending['trigger'] = pending['trigger'], None
+        logs, pending['logs'] = pending['logs'], []
+        if balance is not None:
+            self._on_balance_update(*balance)
+        if position is not None:
+            self._on_position_update(position)
+        if trigger is not None:
+            self._on_trigger_update(*trigger)
+        if logs:
+            self.log_panel.log_batch(logs)
+    
     def _on_trigger_update(self, ref_price, trigger_price):
         """Update chart with trigger level (shows where buy would happen)"""
         self.chart_panel.set_trigger_level(trigger_price)
@@ -755,29 +966,21 @@ class TradingDashboard(QMainWindow):
             holdings=holdings
         )
     
-    @pyqtSlot(dict)
     def _on_position_update(self, pos):
-        if pos.get('in_position'):
-            self.entry_price = pos['entry']
-            self.chart_panel.set_entry_price(pos['entry'])
-            self.chart_panel.set_exit_levels(pos.get('take_profit'), pos.get('stop_loss'))
+        if pos == self._last_position:
+            return  # e.g. every flat poll
+        self._last_position = pos
+        if pos.in_position:
+            self.entry_price = pos.entry
+            self.chart_panel.set_entry_price(pos.entry)
+            self.chart_panel.set_exit_levels(pos.take_profit, pos.stop_loss)
             self.chart_panel.clear_trigger()
             self.sell_btn.setEnabled(True)
-            self.position_panel.update_data(
-                in_position=True,
-                symbol=pos['symbol'],
-                entry=pos['entry'],
-                current=pos['current'],
-                qty=pos['qty'],
-                pnl_pct=pos['pnl_pct'],
-                pnl_usd=pos['pnl_usd'],
-                duration=pos['duration']
-            )
         else:
             self.entry_price = None
             self.chart_panel.clear_entry()
             self.sell_btn.setEnabled(False)
-            self.position_panel.update_data(in_position=False)
+        self.position_panel.update_data(pos)
     
     @pyqtSlot(dict)
     def _on_trade_executed(self, trade):
@@ -791,43 +994,58 @@ class TradingDashboard(QMainWindow):
             pnl_pct=trade.get('pnl_pct')
         )
     
+    @pyqtSlot(list)
+    def _on_trades_batch(self, trades):
+        self.trade_table.add_trades(trades)
+    
     @pyqtSlot(str, str)
     def _on_log_message(self, message, level):
-        self.log_panel.log(message, level)
+        self._pending['logs'].append((message, level))
+        self._schedule_flush()
     
     @pyqtSlot(str)
     def _on_status_changed(self, status):
+        if status == self._current_status:
+            return
+        self._current_status = status
         self.status_label.setText(f"● {status}")
-        if status == "Running":
-            self.status_label.setObjectName("status-running")
-        elif status == "Stopped":
-            self.status_label.setObjectName("status-stopped")
-        else:
-            self.status_label.setObjectName("status-connecting")
-        self.status_label.setStyle(self.status_label.style())
+        name = self._status_names.get(status, "status-connecting")
+        if name != self.status_label.objectName():
+            # re-polish this one label for the new #id rule; only on an actual change
+            self.status_label.setObjectName(name)
+            style = self.status_label.style()
+            style.unpolish(self.status_label)
+            style.polish(self.status_label)
     
     @pyqtSlot(str)
     def _on_error(self, error):
-        QMessageBox.critical(self, "Error", error)
+        if self._error_shown:
+            return  # one dialog at a time; the worker logs every error anyway
+        if self._error_box is None:
+            self._error_box = QMessageBox(QMessageBox.Critical, "Error", "", QMessageBox.Ok, self)
+        self._error_shown = True
+        self._error_box.setText(error)
+        self._error_box.exec_()
+        self._error_shown = False
         self._stop_bot()
     
-    def _on_timer_tick(self):
-        # Could add additional periodic updates here
-        pass
-    
     def closeEvent(self, event):
         """Clean shutdown when window closes"""
-        if self.is_running:
-            self._stop_bot()
+        if self.worker:
+            # the thread must be done before the window (its parent) goes away
+            self.worker.stop()
+            self.worker.wait(5000)
         event.accept()
 
 
 def run_gui():
     """Entry point for GUI mode"""
-    from PyQt5.QtWidgets import QApplication
-    
     app = QApplication(sys.argv)
     app.setStyle('Fusion')  # consistent look across platforms
+    # parsed once for the whole app; every window and dialog inherits it
+    app.setStyleSheet(DARK_THEME)
+    # before any chart is built: pyqtgraph reads this when a plot is created
+    enable_opengl_charts()
     
     window = TradingDashboard()
     window.show()
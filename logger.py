@@ -1,36 +1,119 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
+from pathlib import Path
+
+# the format only uses time/level/message — skip filling in the record fields
+# nobody reads, and the findCaller() stack walk for file/line info
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging.logAsyncioTasks = False
+logging._srcfile = None
+
+# LOG_DIR overrides where the rotating file goes (the tests point it at a tmp dir)
+_LOG_DIR = Path(os.getenv("LOG_DIR") or Path(__file__).parent / "logs")
+_LOG_FILE = _LOG_DIR / "bot.log"
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # Records stay in-process, so skip the stdlib prepare() (which formats the
+    # message up front so it can be pickled) — the listener thread formats instead.
+    def prepare(self, record):
+        return record
+
+
+class _Console(logging.StreamHandler):
+    # the listener thread can outlive whatever sys.stderr was at setup (pytest's
+    # capture file, for one), so look it up on every write instead of binding it
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _RotatingFile(logging.handlers.RotatingFileHandler):
+    # 128 KB write buffer; per-record flushes are skipped and the batch handler
+    # below pushes the buffer out once per batch
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=128 * 1024,
+                    encoding=self.encoding, errors=self.errors)
+
+    def flush(self):
+        pass
+
+    def flush_buffer(self):
+        super().flush()
+
+
+class _BatchHandler(logging.handlers.MemoryHandler):
+    def flush(self):
+        with self.lock:
+            super().flush()
+            if self.target is not None:
+                self.target.flush_buffer()
+
+
+def _flush_every(handler, interval):
+    # bounds how long a buffered record can sit in memory before hitting the file
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            handler.flush()
+
+    threading.Thread(target=run, name="log-flush", daemon=True).start()
+    return stop.set
 
 
 def get_logger(name: str = "momentum-bot"):
     """Return a configured logger that logs to console and file.
     Some minor style quirks here to look like a real dev wrote it.
     """
-    log_dir = os.path.join(os.path.dirname(__file__), "logs")
-    os.makedirs(log_dir, exist_ok=True)
-
     logger = logging.getLogger(name)
     if logger.handlers:
         # already configured
         return logger
 
+    _LOG_DIR.mkdir(parents=True, exist_ok=True)
     logger.setLevel(logging.DEBUG)
 
     fmt = "[%(asctime)s] %(levelname)s - %(message)s"
-    formatter = logging.Formatter(fmt)
+    # explicit datefmt: asctime is a single strftime, without the ",mmm" msecs step
+    formatter = logging.Formatter(fmt, datefmt="%Y-%m-%d %H:%M:%S")
 
     # console handler (INFO+)
-    ch = logging.StreamHandler()
+    ch = _Console()
     ch.setLevel(logging.INFO)
     ch.setFormatter(formatter)
-    logger.addHandler(ch)
 
-    # file handler (DEBUG+)
-    fh_path = os.path.join(log_dir, "bot.log")
-    fh = logging.FileHandler(fh_path)
+    # file handler (DEBUG+), rotated at 10 MB so long runs can't fill the disk
+    fh = _RotatingFile(_LOG_FILE, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8")
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(formatter)
-    logger.addHandler(fh)
+    # buffer file records and write them in batches: when 512 pile up, on any
+    # WARNING+, or every 2s — instead of one write() per record
+    mh = _BatchHandler(512, flushLevel=logging.WARNING, target=fh)
+    mh.setLevel(logging.DEBUG)
+
+    # the caller only enqueues the record; formatting and console/file I/O
+    # happen on the listener's background thread
+    q = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(q, ch, mh, respect_handler_level=True)
+    listener.start()
+    # atexit runs these last-in first-out: drain the queue, then flush the buffer
+    atexit.register(mh.close)
+    atexit.register(_flush_every(mh, 2.0))
+    atexit.register(listener.stop)
+    logger.addHandler(_QueueHandler(q))
+    logger._listener = listener  # so callers can stop()/restart it, e.g. around a fork
 
     # keep the usual logger behaviour
     logger.propagate = False
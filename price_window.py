@@ -0,0 +1,97 @@
+# price_window.py - Sliding window of price ticks for the momentum check
+# Stored as two parallel float64 arrays (timestamps, prices) instead of tuples
+
+import numpy as np
+
+
+class PriceWindow:
+    """Sliding window of (timestamp, price) ticks, oldest first.
+
+    The live ticks always sit in one contiguous slice of the buffers, so window
+    math (np.min/np.max/np.mean...) runs over plain array views. When the write
+    head hits the end, the live slice is moved back to the front (or the buffers
+    grow if they're mostly full) — amortized O(1) per append.
+
+    Timestamps are expected to be non-decreasing, like a trade stream.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self._ts = np.empty(capacity, dtype=np.float64)
+        self._px = np.empty(capacity, dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    @classmethod
+    def from_ticks(cls, ticks):
+        """Build a window from an iterable of (timestamp, price) tuples."""
+        ticks = list(ticks)
+        window = cls(capacity=max(4096, 2 * len(ticks)))
+        for ts, price in ticks:
+            window.append(ts, price)
+        return window
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __iter__(self):
+        for i in range(self._start, self._end):
+            yield float(self._ts[i]), float(self._px[i])
+
+    def append(self, ts: float, price: float):
+        if self._end == len(self._ts):
+            self._make_room()
+        self._ts[self._end] = ts
+        self._px[self._end] = price
+        self._end += 1
+
+    def purge(self, cutoff: float):
+        """Drop ticks older than cutoff."""
+        live = self._ts[self._start:self._end]
+        self._start += int(np.searchsorted(live, cutoff, side="left"))
+
+    def first(self):
+        """Oldest tick in the window as (timestamp, price)."""
+        return float(self._ts[self._start]), float(self._px[self._start])
+
+    def valid_slice(self, cutoff: float):
+        """(timestamps, prices) views of the ticks at or after cutoff."""
+        live = self._ts[self._start:self._end]
+        i = self._start + int(np.searchsorted(live, cutoff, side="left"))
+        return self._ts[i:self._end], self._px[i:self._end]
+
+    def evaluate(self, kernel, *args):
+        """Run kernel(ts_buf, px_buf, start, end, *args) -> (new_start, *result).
+
+        Lets a compiled routine purge and read the window in the same pass;
+        the returned start is committed and the rest is handed back.
+        """
+        start, *result = kernel(self._ts, self._px, self._start, self._end, *args)
+        self._start = start
+        return result
+
+    @property
+    def timestamps(self):
+        return self._ts[self._start:self._end]
+
+    @property
+    def prices(self):
+        return self._px[self._start:self._end]
+
+    def clear(self):
+        self._start = 0
+        self._end = 0
+
+    def _make_room(self):
+        n = len(self)
+        if n > len(self._ts) // 2:
+            # mostly live data — grow instead of shuffling on every append
+            ts = np.empty(len(self._ts) * 2, dtype=np.float64)
+            px = np.empty(len(self._px) * 2, dtype=np.float64)
+            ts[:n] = self._ts[self._start:self._end]
+            px[:n] = self._px[self._start:self._end]
+            self._ts, self._px = ts, px
+        else:
+            self._ts[:n] = self._ts[self._start:self._end]
+            self._px[:n] = self._px[self._start:self._end]
+        self._start = 0
+        self._end = n
@@ -0,0 +1,89 @@
+# strategy_kernel.py - Per-tick buy/sell decision as plain numeric functions
+# JIT-compiled with numba when it's installed, runs as normal Python otherwise
+
+import functools
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # stand-in decorator so the kernel still works without numba
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+# action codes returned by the tick kernels
+HOLD = 0
+BUY = 1
+SELL = 2
+EMERGENCY_SELL = 3
+
+
+@functools.lru_cache(maxsize=16)
+def make_entry_check(buy_drop_pct):
+    """Flat-position buy check for one buy_drop_pct -> f(price, ref_price).
+
+    Returns (action, drop_pct), same threshold as utils.check_price_drop. The
+    threshold is baked in as a compile-time constant instead of being passed
+    on every tick. Cached per value, so a settings change only compiles once.
+    """
+    threshold = float(buy_drop_pct)
+
+    @njit
+    def entry_check(price, ref_price):
+        if ref_price <= 0.0:
+            return HOLD, 0.0
+        drop_pct = ((ref_price - price) / ref_price) * 100.0
+        if drop_pct >= threshold:
+            return BUY, drop_pct
+        return HOLD, drop_pct
+
+    entry_check(1.0, 1.0)  # compile here rather than on the first tick
+    return entry_check
+
+
+@functools.lru_cache(maxsize=16)
+def make_sliding_tick(buy_drop_pct):
+    """Fused sliding-window tick for one buy_drop_pct: purge, reference read and
+    signal check in a single compiled call over the PriceWindow buffers.
+
+    f(ts_buf, px_buf, start, end, cutoff, price, in_position, entry_price,
+      tp_price, sl_price) -> (new_start, action, pct)
+
+    The new tick must already be appended (at end - 1), so the window is never
+    empty and the reference is the oldest tick still inside it.
+    """
+    threshold = float(buy_drop_pct)
+
+    @njit(boundscheck=False)
+    def sliding_tick(ts_buf, px_buf, start, end, cutoff, price, in_position,
+                     entry_price, tp_price, sl_price):
+        # expired ticks are popped once each, so a linear scan is amortized O(1)
+        while start < end - 1 and ts_buf[start] < cutoff:
+            start += 1
+
+        if in_position:
+            if price >= tp_price:
+                return start, SELL, (price - entry_price) / entry_price * 100.0
+            if price <= sl_price:
+                return start, EMERGENCY_SELL, (entry_price - price) / entry_price * 100.0
+            return start, HOLD, 0.0
+
+        ref_price = px_buf[start]
+        if ref_price <= 0.0:
+            return start, HOLD, 0.0
+        drop_pct = ((ref_price - price) / ref_price) * 100.0
+        if drop_pct >= threshold:
+            return start, BUY, drop_pct
+        return start, HOLD, drop_pct
+
+    buf = np.ones(1, dtype=np.float64)
+    sliding_tick(buf, buf, 0, 1, 0.0, 1.0, False, 0.0, 0.0, 0.0)  # compile now
+    return sliding_tick
+
@@ -43,6 +43,40 @@ QLabel#loss {
     color: #ff4444;
 }
 
+/* Label roles, set with setProperty("role", ...) */
+QLabel[role="dim"] {
+    color: #888888;
+}
+
+QLabel[role="section"] {
+    color: #888888;
+    margin-top: 8px;
+}
+
+QLabel[role="placeholder"] {
+    color: #888888;
+    font-style: italic;
+}
+
+QLabel[role="toolbar"] {
+    color: #888888;
+    margin-left: 10px;
+}
+
+QLabel[role="hint"] {
+    color: #00ff00;
+    font-style: italic;
+    padding: 8px;
+}
+
+QLabel[role="profit"] {
+    color: #00ff00;
+}
+
+QLabel[role="loss"] {
+    color: #ff4444;
+}
+
 QLabel#status-running {
     color: #00ff00;
     font-weight: bold;
@@ -125,6 +159,70 @@ QComboBox QAbstractItemView {
     border: 1px solid #555555;
 }
 
+/* Toolbar dropdowns (exchange / pair) */
+QComboBox#dark-combo {
+    background: #2a2a2a;
+    border: 1px solid #444;
+    border-radius: 4px;
+    padding: 5px 10px;
+    color: white;
+    min-height: 28px;
+}
+
+QComboBox#dark-combo::drop-down {
+    border: none;
+    width: 25px;
+}
+
+QComboBox#dark-combo::down-arrow {
+    image: none;
+    border-left: 5px solid transparent;
+    border-right: 5px solid transparent;
+    border-top: 6px solid #888;
+    margin-right: 5px;
+}
+
+QComboBox#dark-combo QAbstractItemView {
+    background: #2a2a2a;
+    border: 1px solid #555;
+    selection-background-color: #3a6ea5;
+    color: white;
+    padding: 5px;
+    outline: none;
+}
+
+QComboBox#dark-combo QAbstractItemView::item {
+    min-height: 28px;
+    padding: 5px;
+}
+
+QComboBox#dark-combo QAbstractItemView::item:hover {
+    background: #3a6ea5;
+}
+
+/* Holdings list in the balance panel */
+QListWidget#holdings {
+    background: #252525;
+    border: 1px solid #444;
+    border-radius: 4px;
+    color: white;
+    font-size: 12px;
+    padding: 2px;
+}
+
+QListWidget#holdings::item {
+    padding: 4px 8px;
+    border-bottom: 1px solid #333;
+}
+
+QListWidget#holdings::item:hover {
+    background: #333;
+}
+
+QListWidget#holdings::item:selected {
+    background: #3a6ea5;
+}
+
 /* Line edits */
 QLineEdit {
     background-color: #3d3d3d;
@@ -139,17 +237,17 @@ QLineEdit:focus {
 }
 
 /* Tables */
-QTableWidget {
+QTableView {
     background-color: #2d2d2d;
     border: none;
     gridline-color: #3d3d3d;
 }
 
-QTableWidget::item {
+QTableView::item {
     padding: 6px;
 }
 
-QTableWidget::item:selected {
+QTableView::item:selected {
     background-color: #00d4aa;
     color: #000000;
 }
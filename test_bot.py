@@ -1,6 +1,19 @@
+import asyncio
+import os
 import time
-from bot import TradingBot
-from utils import exponential_backoff
+from dataclasses import replace
+
+import numpy as np
+
+import bot as bot_module
+import utils
+from bot import CIRCUIT_FAILURE_THRESHOLD, TradingBot
+from config import get_config
+from price_window import PriceWindow
+from utils import (
+    check_price_drop, check_price_drop_vec, check_profit_target, check_profit_target_vec,
+    check_stop_loss, check_stop_loss_vec, decorrelated_jitter, exponential_backoff,
+)
 
 
 def test_price_drop_detection():
@@ -13,11 +26,11 @@ def test_price_drop_detection():
     ref_price = 100.0
     now_ts = time.time()
     ref_ts = now_ts - 299  # just inside the 5-min window
-    bot.price_window = [(ref_ts, ref_price)]
+    bot.price_window = PriceWindow.from_ticks([(ref_ts, ref_price)])
 
     # current price is ~2.2% lower
     current = 97.8
-    bot.process_price_tick(current, ts=now_ts)
+    asyncio.run(bot.process_price_tick(current, ts=now_ts))
 
     assert bot.in_position is True, "Bot should have entered a position"
     print(f"✓ Price drop detection working ({((ref_price-current)/ref_price*100):.2f}% drop correctly identified)")
@@ -37,7 +50,7 @@ def test_profit_target():
     entry = bot.entry_price
     # price moves to +3.2%
     current = 103.2
-    bot.process_price_tick(current)
+    asyncio.run(bot.process_price_tick(current))
 
     assert bot.in_position is False, "Bot should have sold on profit target"
     profit_pct = ((current - entry) / entry) * 100
@@ -57,7 +70,7 @@ def test_stop_loss():
     entry = bot.entry_price
     # price drops to -5.1%
     current = 94.9
-    bot.process_price_tick(current)
+    asyncio.run(bot.process_price_tick(current))
 
     assert bot.in_position is False, "Bot should have sold on stop-loss"
     loss_pct = ((entry - current) / entry) * 100
@@ -73,30 +86,287 @@ def test_position_tracking():
     ref_price = 100.0
     now_ts = time.time()
     ref_ts = now_ts - 299
-    bot.price_window = [(ref_ts, ref_price)]
+    bot.price_window = PriceWindow.from_ticks([(ref_ts, ref_price)])
 
     # First tick triggers buy
-    bot.process_price_tick(97.8, ts=now_ts)
+    asyncio.run(bot.process_price_tick(97.8, ts=now_ts))
     first_qty = bot.position_qty
     # Second tick still low but should not double-buy
-    bot.process_price_tick(97.0, ts=now_ts + 1)
+    asyncio.run(bot.process_price_tick(97.0, ts=now_ts + 1))
     assert bot.position_qty == first_qty, "Bot doubled the position (shouldn't)"
     print("✓ Position tracking working (prevented double-buy)")
 
 
+def test_price_window_buffers():
+    """Test PriceWindow directly: purge, valid_slice boundaries and buffer wraparound"""
+    window = PriceWindow(capacity=8)
+    for i in range(6):
+        window.append(float(i), 100.0 + i)
+
+    # cutoff is inclusive: a tick exactly at the cutoff stays in
+    ts, px = window.valid_slice(2.0)
+    assert list(ts) == [2.0, 3.0, 4.0, 5.0] and list(px) == [102.0, 103.0, 104.0, 105.0]
+    assert len(window.valid_slice(2.5)[0]) == 3
+    assert len(window.valid_slice(-1.0)[0]) == 6
+    assert len(window.valid_slice(9.0)[0]) == 0
+    assert len(window) == 6, "valid_slice shouldn't drop anything"
+
+    window.purge(4.0)
+    assert len(window) == 2
+    assert window.first() == (4.0, 104.0)
+    assert list(window.timestamps) == [4.0, 5.0] and list(window.prices) == [104.0, 105.0]
+
+    # buffer end reached with only 2 live ticks: they're moved to the front, no growth
+    window.append(6.0, 106.0)
+    window.append(7.0, 107.0)
+    window.append(8.0, 108.0)
+    assert len(window._ts) == 8 and window._start == 0
+    assert list(window) == [(4.0, 104.0), (5.0, 105.0), (6.0, 106.0), (7.0, 107.0), (8.0, 108.0)]
+
+    # buffer full of live ticks: it doubles and keeps them in order
+    for i in range(9, 13):
+        window.append(float(i), 100.0 + i)
+    assert len(window._ts) == 16
+    assert list(window.timestamps) == [float(i) for i in range(4, 13)]
+    assert list(window.prices) == [100.0 + i for i in range(4, 13)]
+
+    window.clear()
+    assert len(window) == 0 and list(window.prices) == []
+    print("✓ PriceWindow buffers working (purge, cutoff boundaries, wraparound)")
+
+
+def test_price_window_expiry():
+    """Test that ticks older than the lookback window are dropped"""
+    bot = TradingBot(balance=1000.0)
+    bot.execute_buy = bot.buy
+
+    now_ts = time.time()
+    bot.price_window = PriceWindow.from_ticks([(now_ts - 400, 100.0), (now_ts - 200, 99.5)])
+
+    # the 400s-old tick is outside the 5-min window, so 99.5 becomes the reference
+    asyncio.run(bot.process_price_tick(98.0, ts=now_ts))
+
+    assert len(bot.price_window) == 2
+    assert bot.price_window.first() == (now_ts - 200, 99.5)
+    assert bot.in_position is False, "1.5% drop from the in-window reference shouldn't buy"
+    print("✓ Price window expiry working (stale reference dropped)")
+
+
+def test_tumbling_window():
+    """Test that tumbling mode measures the drop from the current window's open"""
+    bot = TradingBot(balance=1000.0)
+    bot.execute_buy = bot.buy
+    bot.window_mode = "tumbling"
+
+    # window boundaries sit at midnight CEST + n * 5min
+    start = 1_700_000_000 - (1_700_000_000 + 7200) % 300
+    asyncio.run(bot.process_price_tick(100.0, ts=start + 10))
+    asyncio.run(bot.process_price_tick(99.0, ts=start + 200))
+    assert bot.in_position is False
+
+    # new window opens at 99.0, so 97.5 is only a ~1.5% drop
+    asyncio.run(bot.process_price_tick(99.0, ts=start + 300))
+    asyncio.run(bot.process_price_tick(97.5, ts=start + 320))
+    assert bot.in_position is False, "Drop should be measured from the new window's open"
+
+    asyncio.run(bot.process_price_tick(97.0, ts=start + 330))
+    assert bot.in_position is True, "Bot should buy on a 2% drop within the window"
+    print("✓ Tumbling window working (reference resets at each window boundary)")
+
+
+def test_window_mode_validation():
+    """Test that an unknown WINDOW_MODE is rejected instead of running sliding mode"""
+    os.environ["WINDOW_MODE"] = "tumble"
+    get_config.cache_clear()
+    try:
+        get_config()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("WINDOW_MODE=tumble should be rejected")
+    finally:
+        del os.environ["WINDOW_MODE"]
+        get_config.cache_clear()
+    print("✓ Window mode validation working (typo rejected)")
+
+
+def test_long_tick_run():
+    """Test a long stream of ticks: window stays bounded, no false buy on small moves"""
+    bot = TradingBot(balance=1000.0)
+    bot.execute_buy = bot.buy
+    # bound once; the loop below only does the calls
+    push = bot.process_price_tick
+    t0 = time.time()
+
+    async def run(n):
+        for i in range(n):
+            await push(100.0 - (i % 10) * 0.05, ts=t0 + i * 0.1)
+
+    # one event loop for the whole run instead of asyncio.run() per tick
+    asyncio.run(run(5000))
+
+    assert bot.in_position is False, "0.45% wiggles shouldn't trigger a buy"
+    # 10 ticks/s over the 5-minute window
+    assert 2990 <= len(bot.price_window) <= 3010
+    print(f"✓ Long tick run working ({len(bot.price_window)} ticks kept of 5000)")
+
+
+def test_vectorized_checks():
+    """Test that the array checks agree with the scalar ones, zero reference included"""
+    current = np.array([97.8, 100.0, 103.2, 94.9, 50.0, 0.0, 100.0])
+    reference = np.array([100.0, 100.0, 100.0, 100.0, 0.0, 0.0, 102.0])
+    for scalar, vec, pct in ((check_price_drop, check_price_drop_vec, 2.0),
+                             (check_profit_target, check_profit_target_vec, 3.0),
+                             (check_stop_loss, check_stop_loss_vec, 5.0)):
+        for threshold in (pct, 0.0):
+            mask, pcts = vec(current, reference, threshold)
+            for i, (c, r) in enumerate(zip(current, reference)):
+                hit, expected = scalar(c, r, threshold)
+                assert mask[i] == hit, f"{vec.__name__}({c}, {r}, {threshold})"
+                assert round(pcts[i], 2) == expected, f"{vec.__name__}({c}, {r}, {threshold})"
+    print("✓ Vectorized checks working (match the scalar checks element-wise)")
+
+
 def test_reconnection_logic():
     """Test exponential backoff on connection failure"""
     delays = [exponential_backoff(i) for i in range(4)]
-    # expected 1,2,4,8
+    assert delays == [1, 2, 4, 8]
+    assert exponential_backoff(10) == 32, "delay should be capped"
     print(f"✓ Reconnection logic working (backoff: {int(delays[0])}s, {int(delays[1])}s, {int(delays[2])}s, {int(delays[3])}s)")
 
 
+def test_circuit_breaker():
+    """Test that repeated order failures pause trading for the cooldown"""
+    bot = TradingBot(balance=1000.0)
+    bot.execute_buy = bot.buy
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        bot._record_failure()
+    assert bot.circuit_open
+
+    now_ts = time.time()
+    asyncio.run(bot.process_price_tick(100.0, ts=now_ts - 60))
+    asyncio.run(bot.process_price_tick(97.0, ts=now_ts))
+    assert bot.in_position is False, "Signals should be dropped while the circuit is open"
+    print("✓ Circuit breaker working (signals dropped during cooldown)")
+
+
+def test_fetch_price_failures():
+    """Test that a failed price poll counts once toward the breaker, not once per retry"""
+    class FailingREST:
+        calls = 0
+
+        async def ticker_price(self, market_id):
+            FailingREST.calls += 1
+            raise ConnectionError("ticker down")
+
+    async def no_sleep(delay):
+        pass
+
+    async def poll(n):
+        for _ in range(n):
+            try:
+                await bot.fetch_price()
+            except ConnectionError:
+                pass
+
+    bot = TradingBot(balance=1000.0)
+    bot._exchange = object()  # skip the ccxt client; the _rest stub answers
+    bot._rest = FailingREST()
+    real_sleep, utils._retry_sleep = utils._retry_sleep, no_sleep  # no retry backoff waits
+    try:
+        asyncio.run(poll(CIRCUIT_FAILURE_THRESHOLD - 1))
+        assert FailingREST.calls == 3 * (CIRCUIT_FAILURE_THRESHOLD - 1), "each poll should retry 3 times"
+        assert not bot.circuit_open, "retries of one poll shouldn't each count as a failure"
+        asyncio.run(poll(1))
+        assert bot.circuit_open
+    finally:
+        utils._retry_sleep = real_sleep
+    print(f"✓ Price fetch failures working (breaker opened after {CIRCUIT_FAILURE_THRESHOLD} failed polls)")
+
+
+def test_decorrelated_jitter():
+    """Test that reconnect delays stay between the base and the cap"""
+    delays = [decorrelated_jitter(d) for d in (0.0, 1.0, 4.0, 30.0)]
+    assert all(1.0 <= d <= 32.0 for d in delays)
+    print("✓ Decorrelated jitter working (delays within bounds)")
+
+
+def test_stream_error_limit():
+    """Test that run() returns once the price stream hits its error limit"""
+    class BlockedWS:
+        # stands in for the user-data socket: blocks until closed
+        def __init__(self):
+            self.closed = asyncio.Event()
+
+        async def close(self):
+            self.closed.set()
+
+    async def no_balance():
+        pass
+
+    async def failing_stream():
+        raise ConnectionError("stream down")
+
+    async def account_stream():
+        bot._user_ws = ws = BlockedWS()
+        await ws.closed.wait()
+        bot._user_ws = None
+
+    bot = TradingBot(balance=1000.0, config=replace(get_config(), api_key="key", api_secret="secret"))
+    bot._exchange = object()
+    bot.fetch_balance = no_balance
+    bot._stream_prices = failing_stream
+    bot._stream_account = account_stream
+    real_jitter, bot_module.decorrelated_jitter = bot_module.decorrelated_jitter, lambda prev: 0.0
+    try:
+        # a long status interval: run() must not wait for its next wake-up either
+        asyncio.run(asyncio.wait_for(bot.run(poll_interval=3600), timeout=5))
+    finally:
+        bot_module.decorrelated_jitter = real_jitter
+    assert bot._backoff_attempts == 10
+    assert bot._running is False
+    print("✓ Stream error limit working (run() returned after 10 errors)")
+
+
+def test_trade_hooks():
+    """Test that on_buy/on_sell fire after a fill with the trade details"""
+    bot = TradingBot(balance=1000.0)
+    bot.execute_buy = bot.buy
+    bot.execute_sell = bot.sell
+    fills = []
+    bot.on_buy = lambda price, qty: fills.append(("buy", price, qty))
+    bot.on_sell = lambda price, qty, entry, emergency: fills.append(("sell", price, qty, entry, emergency))
+
+    now_ts = time.time()
+    bot.price_window = PriceWindow.from_ticks([(now_ts - 60, 100.0)])
+    asyncio.run(bot.process_price_tick(97.0, ts=now_ts))
+    qty = bot.position_qty
+    asyncio.run(bot.process_price_tick(90.0, ts=now_ts + 1))
+
+    assert fills == [("buy", 97.0, qty), ("sell", 90.0, qty, 97.0, True)]
+    # exit levels are cleared with the entry, so nothing stale can trigger
+    assert bot.take_profit_price == float("inf")
+    assert bot.stop_loss_price == float("-inf")
+    print("✓ Trade hooks working (buy and stop-loss sell reported)")
+
+
 if __name__ == "__main__":
     print("Running bot tests...\n")
     test_price_drop_detection()
     test_profit_target()
     test_stop_loss()
     test_position_tracking()
+    test_price_window_buffers()
+    test_price_window_expiry()
+    test_tumbling_window()
+    test_window_mode_validation()
+    test_long_tick_run()
+    test_vectorized_checks()
     test_reconnection_logic()
+    test_circuit_breaker()
+    test_fetch_price_failures()
+    test_decorrelated_jitter()
+    test_stream_error_limit()
+    test_trade_hooks()
     print("\nAll tests passed! ✓")
     print("Bot logic verified and ready for testnet deployment.")
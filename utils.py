@@ -1,16 +1,20 @@
+import asyncio
+import functools
+import random
 import time
 
+import numpy as np
+
 
 def check_price_drop(current_price, reference_price, threshold_pct=2.0):
     """Return (bool, pct) — True if drop >= threshold.
 
     A small, realistic implementation — not over-documented on purpose.
     """
-    try:
-        drop_pct = ((reference_price - current_price) / reference_price) * 100.0
-    except Exception:
-        # defensive
+    if not reference_price:
+        # defensive: no reference yet
         return False, 0.0
+    drop_pct = ((reference_price - current_price) / reference_price) * 100.0
 
     # TODO: make threshold configurable via config
     if drop_pct >= threshold_pct:
@@ -21,21 +25,51 @@ def check_price_drop(current_price, reference_price, threshold_pct=2.0):
 
 
 def check_profit_target(current_price, entry_price, target_pct=3.0):
-    try:
-        profit_pct = ((current_price - entry_price) / entry_price) * 100.0
-    except Exception:
+    if not entry_price:
         return False, 0.0
+    profit_pct = ((current_price - entry_price) / entry_price) * 100.0
     return (profit_pct >= target_pct), round(profit_pct, 2)
 
 
 def check_stop_loss(current_price, entry_price, stop_pct=5.0):
-    try:
-        loss_pct = ((entry_price - current_price) / entry_price) * 100.0
-    except Exception:
+    if not entry_price:
         return False, 0.0
+    loss_pct = ((entry_price - current_price) / entry_price) * 100.0
     return (loss_pct >= stop_pct), round(loss_pct, 2)
 
 
+# Array versions of the checks above, for a whole window (e.g. PriceWindow.prices)
+# or several symbols at once: (bool mask, pct array), one numpy pass, no rounding.
+# A zero reference/entry gives (False, 0.0) for that element, like the scalar versions.
+
+def _pct_change(num, den):
+    # num * 100 / den, 0.0 where den == 0
+    out = np.zeros(np.broadcast(num, den).shape, dtype=np.float64)
+    np.divide(num * 100.0, den, out=out, where=den != 0)
+    return out
+
+
+def check_price_drop_vec(current, reference, threshold_pct=2.0):
+    current = np.asarray(current, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    drop_pct = _pct_change(reference - current, reference)
+    return (drop_pct >= threshold_pct) & (reference != 0), drop_pct
+
+
+def check_profit_target_vec(current, entry, target_pct=3.0):
+    current = np.asarray(current, dtype=np.float64)
+    entry = np.asarray(entry, dtype=np.float64)
+    profit_pct = _pct_change(current - entry, entry)
+    return (profit_pct >= target_pct) & (entry != 0), profit_pct
+
+
+def check_stop_loss_vec(current, entry, stop_pct=5.0):
+    current = np.asarray(current, dtype=np.float64)
+    entry = np.asarray(entry, dtype=np.float64)
+    loss_pct = _pct_change(entry - current, entry)
+    return (loss_pct >= stop_pct) & (entry != 0), loss_pct
+
+
 def exponential_backoff(attempt: int, base: float = 1.0, cap: float = 32.0):
     """Return delay in seconds for a given attempt count.
 
@@ -46,3 +80,33 @@ def exponential_backoff(attempt: int, base: float = 1.0, cap: float = 32.0):
         delay = cap
     # small sleep to simulate the backoff in tests if needed
     return delay
+
+
+def decorrelated_jitter(prev: float, base: float = 1.0, cap: float = 32.0):
+    """Next retry delay using decorrelated jitter (random between base and 3x the last delay).
+
+    Keeps a crowd of clients from all retrying on the same 1s, 2s, 4s... beat.
+    """
+    return min(cap, random.uniform(base, max(base, prev) * 3))
+
+
+# the wait between retries; looked up per call so tests can swap in a no-op
+_retry_sleep = asyncio.sleep
+
+
+def async_retry(attempts: int = 3, base: float = 0.5, cap: float = 8.0):
+    """Retry an async function with jittered backoff; re-raises the last error."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            delay = base
+            for attempt in range(attempts):
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    if attempt == attempts - 1:
+                        raise
+                    delay = decorrelated_jitter(delay, base, cap)
+                    await _retry_sleep(delay)
+        return wrapper
+    return decorator
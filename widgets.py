@@ -2,14 +2,19 @@
 # Nothing fancy, just practical panels and components
 
 from PyQt5.QtWidgets import (
-    QFrame, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget,
-    QTableWidgetItem, QHeaderView, QSizePolicy, QComboBox
+    QFrame, QVBoxLayout, QHBoxLayout, QLabel, QTableView,
+    QHeaderView, QSizePolicy, QComboBox, QListWidget, QListWidgetItem,
+    QStyledItemDelegate, QStyle
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from PyQt5.QtGui import QColor, QTextCharFormat, QTextCursor, QOpenGLContext
 from styles import COLORS
 from datetime import datetime
-from collections import deque
+from collections import deque, namedtuple
+import functools
+import time
+
+import numpy as np
 
 try:
     import pyqtgraph as pg
@@ -17,6 +22,36 @@ try:
 except ImportError:
     HAS_PYQTGRAPH = False
 
+# PnL label styles, built once; panels only re-apply them when the sign flips
+_PROFIT_SS = f"color: {COLORS['profit']}; font-size: 16px; font-weight: bold;"
+_LOSS_SS = f"color: {COLORS['loss']}; font-size: 16px; font-weight: bold;"
+_POS_PROFIT_SS = f"color: {COLORS['profit']};"
+_POS_LOSS_SS = f"color: {COLORS['loss']};"
+
+# bound str.format callables for the panel and trade-table number formats
+_USD = "${:,.2f}".format
+_USD_SIGNED = "${:+,.2f}".format
+_PCT_SIGNED = "{:+.2f}%".format
+_QTY = "{:.6f}".format
+_PNL = "${:+,.2f} ({:+.2f}%)".format
+
+
+def _set_if_changed(label, fmt, *values):
+    """setText(fmt(*values)), skipped when the values match the last call."""
+    if getattr(label, "_last_values", None) == values:
+        return
+    label._last_values = values
+    label.setText(fmt(*values))
+
+
+# one snapshot of the open position, as shown by PositionPanel
+Position = namedtuple(
+    "Position",
+    "in_position symbol entry current qty pnl_pct pnl_usd duration take_profit stop_loss",
+    defaults=("", 0.0, 0.0, 0.0, 0.0, 0.0, "", None, None),
+)
+NO_POSITION = Position(False)
+
 
 class Panel(QFrame):
     """Base panel with consistent styling"""
@@ -34,6 +69,15 @@ class Panel(QFrame):
             title_label = QLabel(title)
             title_label.setObjectName("title")
             self.layout.addWidget(title_label)
+        
+        # latest update that arrived while hidden; replayed once on show
+        self._deferred = None
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._deferred is not None:
+            deferred, self._deferred = self._deferred, None
+            deferred()
 
 
 class BalancePanel(Panel):
@@ -41,51 +85,37 @@ class BalancePanel(Panel):
     def __init__(self, parent=None):
         super().__init__("Account Balance", parent)
         
-        from PyQt5.QtWidgets import QListWidget, QListWidgetItem
-        
         self.total_label = self._create_row("Total Value:", "$0.00")
         self.usdt_label = self._create_row("USDT:", "$0.00")
         self.pnl_label = self._create_row("Session PnL:", "0.00%")
         
         # Holdings list (scrollable)
         holdings_label = QLabel("Holdings:")
-        holdings_label.setStyleSheet("color: #888888; margin-top: 8px;")
+        holdings_label.setProperty("role", "section")
         self.layout.addWidget(holdings_label)
         
         self.holdings_list = QListWidget()
         self.holdings_list.setMaximumHeight(80)
-        self.holdings_list.setStyleSheet("""
-            QListWidget {
-                background: #252525;
-                border: 1px solid #444;
-                border-radius: 4px;
-                color: white;
-                font-size: 12px;
-                padding: 2px;
-            }
-            QListWidget::item {
-                padding: 4px 8px;
-                border-bottom: 1px solid #333;
-            }
-            QListWidget::item:hover {
-                background: #333;
-            }
-            QListWidget::item:selected {
-                background: #3a6ea5;
-            }
-        """)
-        self.holdings_list.addItem("No holdings")
+        self.holdings_list.setObjectName("holdings")
+        self._placeholder = QListWidgetItem("No holdings")
+        self.holdings_list.addItem(self._placeholder)
         self.layout.addWidget(self.holdings_list)
+        # asset -> its row, so a balance change edits just the rows that moved;
+        # rows of sold-off assets are hidden and reused rather than deleted
+        self._holding_items = {}
+        self._spare_items = []
+        self._last_holdings = None
         
         self.balance_history = []
         self.start_balance = None
+        self._pnl_sign = None
         
         self.layout.addStretch()
     
     def _create_row(self, label_text, value_text):
         row = QHBoxLayout()
         label = QLabel(label_text)
-        label.setStyleSheet("color: #888888;")
+        label.setProperty("role", "dim")
         value = QLabel(value_text)
         value.setObjectName("value")
         value.setAlignment(Qt.AlignRight)
@@ -94,31 +124,55 @@ class BalancePanel(Panel):
         self.layout.addLayout(row)
         return value
     
+    def _sync_holdings(self, holdings):
+        rows = {asset: f"{asset}: {qty:.6f}" for asset, qty in holdings.items()
+                if qty > 0.00001 and asset != 'USDT'}
+        items = self._holding_items
+        for asset in [a for a in items if a not in rows]:
+            item = items.pop(asset)
+            item.setHidden(True)
+            self._spare_items.append(item)
+        for asset, text in rows.items():
+            item = items.get(asset)
+            if item is None:
+                if self._spare_items:
+                    item = self._spare_items.pop()
+                    item.setHidden(False)
+                else:
+                    item = QListWidgetItem()
+                    self.holdings_list.addItem(item)
+                items[asset] = item
+            if item.text() != text:
+                item.setText(text)
+        self._placeholder.setHidden(bool(rows))
+    
     def update_data(self, total=0, available=0, in_position=0, pnl=0, holdings=None):
-        self.total_label.setText(f"${total:,.2f}")
-        self.usdt_label.setText(f"${available:,.2f}")
-        
-        if holdings:
-            self.holdings_list.clear()
-            has_holdings = False
-            for asset, qty in holdings.items():
-                if qty > 0.00001 and asset != 'USDT':
-                    self.holdings_list.addItem(f"{asset}: {qty:.6f}")
-                    has_holdings = True
-            if not has_holdings:
-                self.holdings_list.addItem("No holdings")
+        if not self.isVisible():
+            if not holdings and self._deferred is not None:
+                # keep the last holdings list that came in while hidden
+                holdings = self._deferred.keywords['holdings']
+            self._deferred = functools.partial(
+                self.update_data, total=total, available=available,
+                in_position=in_position, pnl=pnl, holdings=holdings
+            )
+            return
+        _set_if_changed(self.total_label, _USD, total)
+        _set_if_changed(self.usdt_label, _USD, available)
+        
+        if holdings and holdings != self._last_holdings:
+            self._last_holdings = dict(holdings)
+            self._sync_holdings(holdings)
         
         if self.start_balance is None and total > 0:
             self.start_balance = total
         
         if self.start_balance and self.start_balance > 0:
             session_pnl = ((total - self.start_balance) / self.start_balance) * 100
-            pnl_text = f"{session_pnl:+.2f}%"
-            if session_pnl >= 0:
-                self.pnl_label.setStyleSheet(f"color: {COLORS['profit']}; font-size: 16px; font-weight: bold;")
-            else:
-                self.pnl_label.setStyleSheet(f"color: {COLORS['loss']}; font-size: 16px; font-weight: bold;")
-            self.pnl_label.setText(pnl_text)
+            sign = session_pnl >= 0
+            if sign != self._pnl_sign:
+                self._pnl_sign = sign
+                self.pnl_label.setStyleSheet(_PROFIT_SS if sign else _LOSS_SS)
+            _set_if_changed(self.pnl_label, _PCT_SIGNED, session_pnl)
 
 
 class PositionPanel(Panel):
@@ -128,10 +182,17 @@ class PositionPanel(Panel):
         super().__init__("Current Position", parent)
         
         self.no_position_label = QLabel("No open position")
-        self.no_position_label.setStyleSheet("color: #888888; font-style: italic;")
+        self.no_position_label.setProperty("role", "placeholder")
         self.no_position_label.setAlignment(Qt.AlignCenter)
         
-        # Position details (hidden when no position)
+        # Position details, built on the first open position (see _build_details)
+        self.details_widget = None
+        self._pnl_sign = None
+        
+        self.layout.addWidget(self.no_position_label)
+        self.layout.addStretch()
+    
+    def _build_details(self):
         self.details_widget = QFrame()
         details_layout = QVBoxLayout(self.details_widget)
         details_layout.setContentsMargins(0, 0, 0, 0)
@@ -144,16 +205,13 @@ class PositionPanel(Panel):
         self.pnl_label = self._create_row(details_layout, "PnL:", "—")
         self.duration_label = self._create_row(details_layout, "Duration:", "—")
         
-        self.layout.addWidget(self.no_position_label)
-        self.layout.addWidget(self.details_widget)
-        self.details_widget.hide()
-        
-        self.layout.addStretch()
+        # right below the placeholder, above the stretch
+        self.layout.insertWidget(self.layout.indexOf(self.no_position_label) + 1, self.details_widget)
     
     def _create_row(self, layout, label_text, value_text):
         row = QHBoxLayout()
         label = QLabel(label_text)
-        label.setStyleSheet("color: #888888;")
+        label.setProperty("role", "dim")
         value = QLabel(value_text)
         value.setAlignment(Qt.AlignRight)
         row.addWidget(label)
@@ -161,43 +219,88 @@ class PositionPanel(Panel):
         layout.addLayout(row)
         return value
     
-    def update_data(self, in_position=False, symbol="", entry=0, current=0, qty=0, pnl_pct=0, pnl_usd=0, duration=""):
-        if not in_position:
+    def update_data(self, pos):
+        """Show a Position snapshot (NO_POSITION for flat)."""
+        if not self.isVisible():
+            self._deferred = functools.partial(self.update_data, pos)
+            return
+        if not pos.in_position:
             self.no_position_label.show()
-            self.details_widget.hide()
+            if self.details_widget is not None:
+                self.details_widget.hide()
             return
         
+        if self.details_widget is None:
+            self._build_details()
         self.no_position_label.hide()
         self.details_widget.show()
         
-        self.symbol_label.setText(symbol)
-        self.entry_label.setText(f"${entry:,.2f}")
-        self.current_label.setText(f"${current:,.2f}")
-        self.qty_label.setText(f"{qty:.6f}")
-        
-        pnl_text = f"${pnl_usd:+,.2f} ({pnl_pct:+.2f}%)"
-        if pnl_pct >= 0:
-            self.pnl_label.setStyleSheet(f"color: {COLORS['profit']};")
-        else:
-            self.pnl_label.setStyleSheet(f"color: {COLORS['loss']};")
-        self.pnl_label.setText(pnl_text)
-        
-        self.duration_label.setText(duration)
+        _set_if_changed(self.symbol_label, str, pos.symbol)
+        _set_if_changed(self.entry_label, _USD, pos.entry)
+        _set_if_changed(self.current_label, _USD, pos.current)
+        _set_if_changed(self.qty_label, _QTY, pos.qty)
+        
+        sign = pos.pnl_pct >= 0
+        if sign != self._pnl_sign:
+            self._pnl_sign = sign
+            self.pnl_label.setStyleSheet(_POS_PROFIT_SS if sign else _POS_LOSS_SS)
+        _set_if_changed(self.pnl_label, _PNL, pos.pnl_usd, pos.pnl_pct)
+        _set_if_changed(self.duration_label, str, pos.duration)
+
+
+def enable_opengl_charts():
+    """Switch pyqtgraph to OpenGL rendering, app-wide, if it can work here.
+
+    Call once from startup, after the QApplication exists. Needs a real GL
+    context (remote desktops and offscreen runs have none); the experimental
+    GL curve drawing is only turned on when PyOpenGL is installed too.
+    Returns whether OpenGL was enabled.
+    """
+    if not HAS_PYQTGRAPH or not QOpenGLContext().create():
+        return False
+    try:
+        import OpenGL  # noqa: F401
+        experimental = True
+    except ImportError:
+        experimental = False
+    pg.setConfigOptions(useOpenGL=True, enableExperimental=experimental)
+    return True
 
 
 class PriceChartPanel(Panel):
     
-    def __init__(self, parent=None):
+    # (price attribute, line attribute, colour, width, label, label position)
+    LINES = (
+        ('entry_price', 'entry_line', '#ffaa00', 1, 'Entry: ${:.0f}', 0.95),
+        ('take_profit_price', 'tp_line', '#00ff00', 2, 'TP: ${:.0f}', 0.85),
+        ('stop_loss_price', 'sl_line', '#ff4444', 2, 'SL: ${:.0f}', 0.75),
+        ('trigger_price', 'trigger_line', '#00ff00', 2, 'BUY if ≤ ${:.0f}', 0.05),
+    )
+    
+    def __init__(self, parent=None, antialias=False):
         super().__init__("Price Chart", parent)
         
-        self.prices = deque(maxlen=50)
+        # last 50 prices in a float64 ring; each one is written at i and i + 50,
+        # so the in-order window is always one contiguous slice — no deque->list
+        self._max_points = 50
+        self._buf = np.zeros(2 * self._max_points, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self._written = 0  # total prices pushed; changes whenever the line does
+        # (written, entry, tp, sl, trigger) as last drawn
+        self._last_sig = None
         self.entry_price = None
         self.trigger_price = None
         self.take_profit_price = None
         self.stop_loss_price = None
         
+        # setters only record state; the redraw runs at most every 50ms
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(50)
+        self._update_timer.timeout.connect(self._do_update_chart)
+        
         if HAS_PYQTGRAPH:
-            pg.setConfigOptions(antialias=True)
             self.plot_widget = pg.PlotWidget()
             self.plot_widget.setBackground('#2d2d2d')
             self.plot_widget.showGrid(x=True, y=True, alpha=0.3)
@@ -205,7 +308,9 @@ class PriceChartPanel(Panel):
             self.plot_widget.getAxis('left').setPen(pg.mkPen(color='#888888'))
             self.plot_widget.getAxis('bottom').setPen(pg.mkPen(color='#888888'))
             
-            self.price_line = self.plot_widget.plot(pen=pg.mkPen(color='#00d4aa', width=2))
+            # the line redraws many times a second: no antialiasing by default
+            # (pass antialias=True for a static view)
+            self.price_line = self.plot_widget.plot(pen=pg.mkPen(color='#00d4aa', width=2), antialias=antialias)
             self.entry_line = None
             self.trigger_line = None
             self.tp_line = None
@@ -214,13 +319,27 @@ class PriceChartPanel(Panel):
             self.layout.addWidget(self.plot_widget)
         else:
             self.fallback_label = QLabel("Price chart requires pyqtgraph\nInstall with: pip install pyqtgraph")
-            self.fallback_label.setStyleSheet("color: #888888; font-style: italic;")
+            self.fallback_label.setProperty("role", "placeholder")
             self.fallback_label.setAlignment(Qt.AlignCenter)
             self.layout.addWidget(self.fallback_label)
             self.layout.addStretch()
     
+    @property
+    def prices(self):
+        """Charted prices, oldest first (a view into the ring buffer)."""
+        start = (self._head - self._count) % self._max_points
+        return self._buf[start:start + self._count]
+    
+    def _push(self, price):
+        i = self._head
+        self._buf[i] = self._buf[i + self._max_points] = price
+        self._head = (i + 1) % self._max_points
+        self._written += 1
+        if self._count < self._max_points:
+            self._count += 1
+    
     def add_price(self, price):
-        self.prices.append(price)
+        self._push(price)
         self._update_chart()
     
     def set_entry_price(self, price):
@@ -247,74 +366,167 @@ class PriceChartPanel(Panel):
         self._update_chart()
     
     def _update_chart(self):
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+    
+    def _do_update_chart(self):
         if not HAS_PYQTGRAPH:
             return
+        if not self.isVisible():
+            # the state above is already stored; draw it when shown
+            self._deferred = self._do_update_chart
+            return
         
-        if len(self.prices) > 0:
-            self.price_line.setData(list(self.prices))
-            
-            if self.entry_price and self.entry_line is None:
-                self.entry_line = pg.InfiniteLine(
-                    pos=self.entry_price,
-                    angle=0,
-                    pen=pg.mkPen(color='#ffaa00', width=1, style=Qt.DashLine),
-                    label='Entry: ${:.0f}'.format(self.entry_price),
-                    labelOpts={'color': '#ffaa00', 'position': 0.95}
-                )
-                self.plot_widget.addItem(self.entry_line)
-            elif self.entry_price and self.entry_line:
-                self.entry_line.setValue(self.entry_price)
-            elif not self.entry_price and self.entry_line:
-                self.plot_widget.removeItem(self.entry_line)
-                self.entry_line = None
-            
-            if self.take_profit_price and self.tp_line is None:
-                self.tp_line = pg.InfiniteLine(
-                    pos=self.take_profit_price,
-                    angle=0,
-                    pen=pg.mkPen(color='#00ff00', width=2, style=Qt.DashLine),
-                    label='TP: ${:.0f}'.format(self.take_profit_price),
-                    labelOpts={'color': '#00ff00', 'position': 0.85}
-                )
-                self.plot_widget.addItem(self.tp_line)
-            elif self.take_profit_price and self.tp_line:
-                self.tp_line.setValue(self.take_profit_price)
-                self.tp_line.label.setText('TP: ${:.0f}'.format(self.take_profit_price))
-            elif not self.take_profit_price and self.tp_line:
-                self.plot_widget.removeItem(self.tp_line)
-                self.tp_line = None
+        sig = (self._written, self.entry_price, self.take_profit_price,
+               self.stop_loss_price, self.trigger_price)
+        if sig == self._last_sig:
+            return  # e.g. clear_trigger() with no trigger shown
+        prices_changed = self._last_sig is None or sig[0] != self._last_sig[0]
+        self._last_sig = sig
+        
+        if self._count > 0:
+            if prices_changed:
+                # copied: pyqtgraph keeps the array, and the ring is written in place
+                self.price_line.setData(self.prices.copy())
             
-            if self.stop_loss_price and self.sl_line is None:
-                self.sl_line = pg.InfiniteLine(
-                    pos=self.stop_loss_price,
-                    angle=0,
-                    pen=pg.mkPen(color='#ff4444', width=2, style=Qt.DashLine),
-                    label='SL: ${:.0f}'.format(self.stop_loss_price),
-                    labelOpts={'color': '#ff4444', 'position': 0.75}
-                )
-                self.plot_widget.addItem(self.sl_line)
-            elif self.stop_loss_price and self.sl_line:
-                self.sl_line.setValue(self.stop_loss_price)
-                self.sl_line.label.setText('SL: ${:.0f}'.format(self.stop_loss_price))
-            elif not self.stop_loss_price and self.sl_line:
-                self.plot_widget.removeItem(self.sl_line)
-                self.sl_line = None
-            
-            if self.trigger_price and self.trigger_line is None:
-                self.trigger_line = pg.InfiniteLine(
-                    pos=self.trigger_price,
-                    angle=0,
-                    pen=pg.mkPen(color='#00ff00', width=2, style=Qt.DashLine),
-                    label='BUY if ≤ ${:.0f}'.format(self.trigger_price),
-                    labelOpts={'color': '#00ff00', 'position': 0.05}
-                )
-                self.plot_widget.addItem(self.trigger_line)
-            elif self.trigger_price and self.trigger_line:
-                self.trigger_line.setValue(self.trigger_price)
-                self.trigger_line.label.setText('BUY if ≤ ${:.0f}'.format(self.trigger_price))
-            elif not self.trigger_price and self.trigger_line:
-                self.plot_widget.removeItem(self.trigger_line)
-                self.trigger_line = None
+            for spec in self.LINES:
+                self._sync_line(*spec)
+    
+    def _sync_line(self, price_attr, line_attr, color, width, label_fmt, label_pos):
+        """Create, move or remove one horizontal level line to match its price."""
+        price = getattr(self, price_attr)
+        line = getattr(self, line_attr)
+        if price and line is None:
+            line = pg.InfiniteLine(
+                pos=price,
+                angle=0,
+                pen=pg.mkPen(color=color, width=width, style=Qt.DashLine),
+                label=label_fmt.format(price),
+                labelOpts={'color': color, 'position': label_pos}
+            )
+            self.plot_widget.addItem(line)
+            setattr(self, line_attr, line)
+        elif price and line:
+            if line.value() != price:  # levels mostly sit still between redraws
+                line.setValue(price)
+                line.label.setText(label_fmt.format(price))
+        elif not price and line:
+            self.plot_widget.removeItem(line)
+            setattr(self, line_attr, None)
+
+
+class TradeTableModel(QAbstractTableModel):
+    """Trade rows for TradeHistoryTable, newest first.
+
+    Cells are formatted once when a trade comes in; data() only indexes into
+    the stored row, so repaints and scrolling don't re-format anything.
+    """
+    
+    HEADERS = ("Time", "Symbol", "Side", "Price", "Quantity", "PnL")
+    
+    def __init__(self, max_rows=10, parent=None):
+        super().__init__(parent)
+        # (cell texts, side colour, pnl colour or None)
+        self._rows = deque(maxlen=max_rows)
+        self._side_colors = {'BUY': QColor(COLORS['accent'])}
+        self._sell_color = QColor(COLORS['warning'])
+        self._profit_color = QColor(COLORS['profit'])
+        self._loss_color = QColor(COLORS['loss'])
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()][0][index.column()]
+        if role == Qt.ForegroundRole:
+            col = index.column()
+            if col == 2:
+                return self._rows[index.row()][1]
+            if col == 5:
+                return self._rows[index.row()][2]
+        return None
+    
+    def cell(self, row, col):
+        """(text, colour or None) for one cell, without going through data()."""
+        texts, side_color, pnl_color = self._rows[row]
+        if col == 2:
+            return texts[col], side_color
+        if col == 5:
+            return texts[col], pnl_color
+        return texts[col], None
+    
+    def _format(self, trade):
+        time_str = trade['time'].strftime("%H:%M:%S") if isinstance(trade['time'], datetime) else str(trade['time'])
+        pnl = trade['pnl']
+        if pnl is not None:
+            if trade.get('pnl_pct') is not None:
+                pnl_text = _PNL(pnl, trade['pnl_pct'])
+            else:
+                pnl_text = _USD_SIGNED(pnl)
+            pnl_color = self._profit_color if pnl >= 0 else self._loss_color
+        else:
+            pnl_text = "—"
+            pnl_color = None
+        texts = (
+            time_str,
+            trade['symbol'],
+            trade['side'],
+            _USD(trade['price']),
+            _QTY(trade['quantity']),
+            pnl_text,
+        )
+        return texts, self._side_colors.get(trade['side'], self._sell_color), pnl_color
+    
+    def add_trades(self, trades):
+        """Prepend trades (oldest first), dropping the oldest rows past max_rows."""
+        rows = [self._format(t) for t in trades][-self._rows.maxlen:]
+        if not rows:
+            return
+        overflow = len(self._rows) + len(rows) - self._rows.maxlen
+        if overflow > 0:
+            n = len(self._rows)
+            self.beginRemoveRows(QModelIndex(), n - overflow, n - 1)
+            for _ in range(overflow):
+                self._rows.pop()
+            self.endRemoveRows()
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self._rows.extendleft(rows)
+        self.endInsertRows()
+
+
+class TradeDelegate(QStyledItemDelegate):
+    """Paints trade cells as plain text straight from TradeTableModel.cell().
+
+    Skips the generic initStyleOption()/style drawing path, which asks the
+    model for every role of every cell on each repaint.
+    """
+    
+    PADDING = 6
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._text_color = QColor(COLORS['text'])
+        self._selected_bg = QColor(COLORS['accent'])
+        self._selected_text = QColor("#000000")
+        self._align = int(Qt.AlignLeft | Qt.AlignVCenter)
+    
+    def paint(self, painter, option, index):
+        text, color = index.model().cell(index.row(), index.column())
+        rect = option.rect
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(rect, self._selected_bg)
+            color = self._selected_text
+        painter.setPen(color or self._text_color)
+        painter.drawText(rect.adjusted(self.PADDING, 0, -self.PADDING, 0), self._align, text)
 
 
 class TradeHistoryTable(Panel):
@@ -323,22 +535,23 @@ class TradeHistoryTable(Panel):
     def __init__(self, parent=None):
         super().__init__("Recent Trades", parent)
         
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["Time", "Symbol", "Side", "Price", "Quantity", "PnL"])
+        self.model = TradeTableModel(parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegate(TradeDelegate(self.table))
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.verticalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        # fixed row height: no per-row size-to-contents pass on insert
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(28)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
         self.table.setMaximumHeight(200)
         
         self.layout.addWidget(self.table)
-        
-        # Store trades
-        self.trades = []
     
     def add_trade(self, timestamp, symbol, side, price, quantity, pnl=None, pnl_pct=None):
-        trade = {
+        self.model.add_trades([{
             'time': timestamp,
             'symbol': symbol,
             'side': side,
@@ -346,42 +559,11 @@ class TradeHistoryTable(Panel):
             'quantity': quantity,
             'pnl': pnl,
             'pnl_pct': pnl_pct
-        }
-        self.trades.insert(0, trade)
-        self.trades = self.trades[:10]
-        self._refresh_table()
+        }])
     
-    def _refresh_table(self):
-        self.table.setRowCount(len(self.trades))
-        
-        for row, trade in enumerate(self.trades):
-            time_str = trade['time'].strftime("%H:%M:%S") if isinstance(trade['time'], datetime) else str(trade['time'])
-            
-            self.table.setItem(row, 0, QTableWidgetItem(time_str))
-            self.table.setItem(row, 1, QTableWidgetItem(trade['symbol']))
-            
-            side_item = QTableWidgetItem(trade['side'])
-            if trade['side'] == 'BUY':
-                side_item.setForeground(QColor(COLORS['accent']))
-            else:
-                side_item.setForeground(QColor(COLORS['warning']))
-            self.table.setItem(row, 2, side_item)
-            
-            self.table.setItem(row, 3, QTableWidgetItem(f"${trade['price']:,.2f}"))
-            self.table.setItem(row, 4, QTableWidgetItem(f"{trade['quantity']:.6f}"))
-            
-            if trade['pnl'] is not None:
-                pnl_text = f"${trade['pnl']:+,.2f}"
-                if trade.get('pnl_pct') is not None:
-                    pnl_text += f" ({trade['pnl_pct']:+.2f}%)"
-                pnl_item = QTableWidgetItem(pnl_text)
-                if trade['pnl'] >= 0:
-                    pnl_item.setForeground(QColor(COLORS['profit']))
-                else:
-                    pnl_item.setForeground(QColor(COLORS['loss']))
-                self.table.setItem(row, 5, pnl_item)
-            else:
-                self.table.setItem(row, 5, QTableWidgetItem("—"))
+    def add_trades(self, trades):
+        """Add several trades (oldest first, same keys as add_trade) in one model update."""
+        self.model.add_trades(trades)
 
 
 class LogPanel(Panel):
@@ -390,32 +572,61 @@ class LogPanel(Panel):
     def __init__(self, parent=None):
         super().__init__("Activity Log", parent)
         
-        from PyQt5.QtWidgets import QTextEdit
+        from PyQt5.QtWidgets import QPlainTextEdit
         
-        self.log_view = QTextEdit()
+        # line-based document, trimmed to the last 5000 lines
+        self.log_view = QPlainTextEdit()
         self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(5000)
+        # inserts would otherwise pile up on the document's undo stack
+        self.log_view.setUndoRedoEnabled(False)
         self.log_view.setMinimumHeight(120)
         
         self.layout.addWidget(self.log_view)
+        
+        # plain-text inserts with prebuilt formats — no HTML parsing per line
+        self._cursor = QTextCursor(self.log_view.document())
+        self._time_format = self._char_format('#888888')
+        self._info_format = (self._char_format(COLORS['text']), "→")
+        self._formats = {
+            "SUCCESS": (self._char_format(COLORS['profit']), "✓"),
+            "ERROR": (self._char_format(COLORS['loss']), "✗"),
+            "WARNING": (self._char_format(COLORS['warning']), "⚠"),
+        }
+        # "[HH:MM:SS] " prefix, re-formatted only when the second rolls over
+        self._ts_second = -1
+        self._ts_cache = ""
+    
+    @staticmethod
+    def _char_format(color):
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor(color))
+        return fmt
+    
+    def _timestamp(self):
+        sec = int(time.time())
+        if sec != self._ts_second:
+            self._ts_second = sec
+            self._ts_cache = time.strftime("[%H:%M:%S] ", time.localtime(sec))
+        return self._ts_cache
     
     def log(self, message, level="INFO"):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        if level == "SUCCESS":
-            color = COLORS['profit']
-            icon = "✓"
-        elif level == "ERROR":
-            color = COLORS['loss']
-            icon = "✗"
-        elif level == "WARNING":
-            color = COLORS['warning']
-            icon = "⚠"
-        else:
-            color = COLORS['text']
-            icon = "→"
-        
-        html = f'<span style="color: #888888;">[{timestamp}]</span> <span style="color: {color};">{icon} {message}</span><br>'
-        self.log_view.insertHtml(html)
+        self.log_batch([(message, level)])
+    
+    def log_batch(self, entries):
+        """Append several (message, level) lines in one edit block, then scroll once."""
+        timestamp = self._timestamp()
+        
+        cursor = self._cursor
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        for message, level in entries:
+            fmt, icon = self._formats.get(level, self._info_format)
+            if not self.log_view.document().isEmpty():
+                cursor.insertBlock()  # one block per line for the block-count trim
+            cursor.insertText(timestamp, self._time_format)
+            cursor.insertText(f"{icon} {message}", fmt)
+        cursor.endEditBlock()
         
         # Auto-scroll to bottom
         scrollbar = self.log_view.verticalScrollBar()